@@ -3,5 +3,6 @@
 from .example_models import Person
 from .example_models import Product
 from .example_models import RootModel
+from .example_models import validate_person_batch, validate_product_batch, validate_root_batch
 
-__all__ = ["Person", "Product"]
\ No newline at end of file
+__all__ = ["Person", "Product", "validate_person_batch", "validate_product_batch", "validate_root_batch"]
\ No newline at end of file
@@ -1,29 +1,46 @@
 """Auto-generated Pydantic models from ontology."""
 
-from pydantic import BaseModel, Field
-from typing import List, Optional, Union
+from pydantic import BaseModel, Field, TypeAdapter
+from typing import List, Literal, Optional, Union
 from datetime import datetime
 
 
 class Person(BaseModel):
     """A person entity"""
-    name: str: Field(description="Full name of the person")
-    age: int: Field(description="Age of the person", ge=0.0, le=150.0)
-    email: str: Field(description="Email address", default=None)
-    status: str: Field(description="Current status", enum=['active', 'inactive', 'pending'])
+    name: str = Field(description='Full name of the person')
+    age: int = Field(description='Age of the person', ge=0.0, le=150.0)
+    email: Optional[str] = Field(description='Email address', default=None)
+    status: Literal['active', 'inactive', 'pending'] = Field(description='Current status')
 
 class Product(BaseModel):
     """A product entity"""
-    id: str: Field(description="Unique product identifier")
-    name: str: Field(description="Product name")
-    price: float: Field(description="Product price", ge=0.0, le=1000000.0)
-    category: str: Field(description="Product category", enum=['electronics', 'clothing', 'books', 'other'])
+    id: str = Field(description='Unique product identifier')
+    name: str = Field(description='Product name')
+    price: float = Field(description='Product price', ge=0.0, le=1000000.0)
+    category: Literal['electronics', 'clothing', 'books', 'other'] = Field(description='Product category')
 
 class RootModel(BaseModel):
     """Root model that can represent any entity type."""
     type: str = Field(description='The type of entity')
     data: Union[Person, Product] = Field(description='The entity data')
 
+# Batch validators (build the list schema once, not per call)
+PERSON_LIST_ADAPTER = TypeAdapter(List[Person])
+PRODUCT_LIST_ADAPTER = TypeAdapter(List[Product])
+ROOT_LIST_ADAPTER = TypeAdapter(List[RootModel])
+
+def validate_person_batch(items: List[dict]) -> List[Person]:
+    """Validate a list of dicts as Person instances in one pass."""
+    return PERSON_LIST_ADAPTER.validate_python(items)
+
+def validate_product_batch(items: List[dict]) -> List[Product]:
+    """Validate a list of dicts as Product instances in one pass."""
+    return PRODUCT_LIST_ADAPTER.validate_python(items)
+
+def validate_root_batch(items: List[dict]) -> List[RootModel]:
+    """Validate a list of dicts as RootModel instances in one pass."""
+    return ROOT_LIST_ADAPTER.validate_python(items)
+
 # Example usage:
 # from .models import Person, Product
 #
@@ -31,4 +48,7 @@ class RootModel(BaseModel):
 # instance = Person(...)
 #
 # # Validate data
-# validated = Person.model_validate(data_dict)
\ No newline at end of file
+# validated = Person.model_validate(data_dict)
+#
+# # Validate many records at once
+# validated = validate_person_batch(list_of_dicts)
\ No newline at end of file
@@ -1,28 +1,42 @@
 # JSON Schema-based grammar for example
 # This is a simpler approach using JSON Schema validation
 
+import functools
 import json
 import jsonschema
 from pathlib import Path
 
-# Load the schema
+# The schema is loaded on first use, not at import time
 SCHEMA_PATH = Path('example.schema.json')
-with open(SCHEMA_PATH) as f:
-    SCHEMA = json.load(f)
+
+@functools.cache
+def load_schema() -> dict:
+    """Load and cache the schema."""
+    with open(SCHEMA_PATH, 'rb') as f:
+        return json.loads(f.read())
+
+@functools.cache
+def _validator():
+    """Check and build the validator once; jsonschema.validate() would redo both per call."""
+    schema = load_schema()
+    validator_cls = jsonschema.validators.validator_for(schema)
+    validator_cls.check_schema(schema)
+    return validator_cls(schema)
+
+def __getattr__(name):
+    # Keep `SCHEMA` importable without loading it eagerly
+    if name == 'SCHEMA':
+        return load_schema()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 def validate_json(data_str: str) -> bool:
     """Validate JSON string against the schema."""
     try:
         data = json.loads(data_str)
-        jsonschema.validate(data, SCHEMA)
-        return True
-    except (json.JSONDecodeError, jsonschema.ValidationError):
+    except json.JSONDecodeError:
         return False
+    return _validator().is_valid(data)
 
 def validate_object(data: dict) -> bool:
     """Validate Python dict against the schema."""
-    try:
-        jsonschema.validate(data, SCHEMA)
-        return True
-    except jsonschema.ValidationError:
-        return False
\ No newline at end of file
+    return _validator().is_valid(data)
\ No newline at end of file
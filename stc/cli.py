@@ -1,15 +1,8 @@
 import typer
 from rich import print as rprint
 
-from stc.ontology.loader import load_ontology
-from stc.emitters.jsonschema import emit_jsonschema
-from stc.emitters.pydantic_models import emit_pydantic_models
-from stc.emitters.ts_interfaces import emit_ts_interfaces
-from stc.emitters.grammar import emit_peg_grammar
-from stc.data.curate import curate_corpus
-from stc.train.trainer import train_model
-from stc.tests.testgen import generate_property_tests
-from stc.deploy.packager import build_bundle, deploy_runtime
+# Command implementations are imported inside each command so that `stc --help`
+# and unrelated subcommands don't pay for emitters, transformers/torch, etc.
 
 app = typer.Typer(help="Semantic Toolchain (stc) CLI")
 
@@ -35,19 +28,25 @@ def compile(
     """
     Compile ontology into schemas, validators & grammars.
     """
+    from stc.ontology.loader import load_ontology
+
     onto = load_ontology(ontology)
     emitted = []
     
     if jsonschema:
+        from stc.emitters.jsonschema import emit_jsonschema
         emit_jsonschema(onto, out)
         emitted.append("jsonschema")
     if pydantic:
+        from stc.emitters.pydantic_models import emit_pydantic_models
         emit_pydantic_models(onto, out)
         emitted.append("pydantic")
     if ts:
+        from stc.emitters.ts_interfaces import emit_ts_interfaces
         emit_ts_interfaces(onto, out)
         emitted.append("ts")
     if grammar:
+        from stc.emitters.grammar import emit_peg_grammar
         emit_peg_grammar(onto, out)
         emitted.append("grammar")
     
@@ -60,11 +59,14 @@ def curate(
     out: str = typer.Option("data/clean/", help="Cleaned output dir"),
     include_tags: str = typer.Option("", help="Comma-separated tags to keep"),
     exclude_tags: str = typer.Option("pii", help="Tags to drop"),
+    skip_dedup: bool = typer.Option(False, "--skip-dedup", help="Skip deduplication (corpus known to be unique)"),
 ):
     """
     Filter/dedupe/annotate raw corpora into ontology-aligned datasets.
     """
-    curate_corpus(raw_dir, out, include_tags.split(","), exclude_tags.split(","))
+    from stc.data.curate import curate_corpus
+
+    curate_corpus(raw_dir, out, include_tags.split(","), exclude_tags.split(","), dedupe=not skip_dedup)
     rprint(f"[cyan]Curated data → {out}[/cyan]")
 
 # ---------- TRAIN ----------
@@ -77,11 +79,14 @@ def train(
     out: str = typer.Option("models/mvm.ckpt", help="Output checkpoint path"),
     lora: bool = typer.Option(True, help="Use LoRA fine-tuning"),
     epochs: int = typer.Option(3, help="Epochs"),
+    parallel: str = typer.Option("auto", help="Multi-GPU strategy: ddp, fsdp or auto (by model size)"),
 ):
     """
     Fine-tune a domain-specific model with schema-aware rejection sampling.
     """
-    train_model(base, data, schema, decoder, out, lora, epochs)
+    from stc.train.trainer import train_model
+
+    train_model(base, data, schema, decoder, out, lora, epochs, parallel)
     rprint(f"[green]Model trained → {out}[/green]")
 
 # ---------- TESTGEN ----------
@@ -93,6 +98,8 @@ def testgen(
     """
     Generate property-based tests from ontology constraints.
     """
+    from stc.tests.testgen import generate_property_tests
+
     generate_property_tests(schema, out)
     rprint(f"[cyan]Generated tests → {out}[/cyan]")
 
@@ -107,6 +114,8 @@ def deploy(
     """
     Package model + validators and deploy with a fail-closed runtime.
     """
+    from stc.deploy.packager import build_bundle, deploy_runtime
+
     artifact = build_bundle(model, schema) if bundle else model
     deploy_runtime(artifact, runtime)
     rprint("[green]Deployment complete[/green]")
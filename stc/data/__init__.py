@@ -1,11 +1,30 @@
 """Data processing module."""
 
-from .curate import curate_corpus
-from .filters import DataFilter, FilterConfig, create_ontology_filter
+import importlib
+
+# Submodules are imported on first attribute access so `import stc.data`
+# doesn't pull in curation and filter regex compilation up front.
+_LAZY_ATTRS = {
+    "curate_corpus": ".curate",
+    "DataFilter": ".filters",
+    "FilterConfig": ".filters",
+    "create_ontology_filter": ".filters",
+}
 
 __all__ = [
     "curate_corpus",
     "DataFilter",
     "FilterConfig", 
     "create_ontology_filter"
-] 
\ No newline at end of file
+]
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        module = importlib.import_module(_LAZY_ATTRS[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -1,14 +1,54 @@
 """Data curation and filtering utilities."""
 
-import json
+import os
+import orjson
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from operator import itemgetter
 from pathlib import Path
-from typing import List, Dict, Any, Set
+from typing import List, Dict, Any, Set, Optional, Tuple
 import hashlib
 from stc.config import ensure_dir
 
-def curate_corpus(raw_dir: str, out_dir: str, include_tags: List[str], exclude_tags: List[str]) -> None:
+# File suffixes curate_corpus picks up from the raw directory
+_DATA_SUFFIXES = frozenset({'.json', '.jsonl', '.yaml', '.yml'})
+
+# Keywords that tag an item when they appear in its text
+_COMMON_TAGS = ('pii', 'sensitive', 'private', 'public', 'internal')
+
+# Hash buckets used to assign items to train/val/test (power of two)
+_SPLIT_BUCKETS = 1024
+# Fibonacci hashing for positions: the top bits of i * 2**64/phi (mod 2**64)
+# spread consecutive positions evenly over the buckets
+_POSITION_SPREAD = 0x9E3779B97F4A7C15
+_POSITION_SHIFT = 64 - (_SPLIT_BUCKETS.bit_length() - 1)
+_MASK64 = (1 << 64) - 1
+
+# Up to this many unique items, splits get exact int(n * ratio) counts;
+# hash buckets only approximate the ratios on small corpora
+_EXACT_SPLIT_MAX_ITEMS = 10_000
+
+# Metadata fields that shouldn't affect deduplication
+_IGNORED_HASH_KEYS = frozenset({'id', 'created_at', 'updated_at', 'source', 'filename'})
+
+def curate_corpus(
+    raw_dir: str,
+    out_dir: str,
+    include_tags: List[str],
+    exclude_tags: List[str],
+    max_workers: Optional[int] = None,
+    dedupe: bool = True
+) -> None:
     """
     Filter/dedupe/annotate raw corpora into ontology-aligned datasets.
+    
+    Files are loaded, filtered and hashed in parallel worker processes
+    (``max_workers=1`` keeps everything in-process); deduplication is then
+    merged in file order so the first occurrence of an item always wins,
+    and unique items are streamed to hash-assigned train/val/test splits
+    instead of being collected and shuffled in memory (small corpora are
+    held back and split exactly to the 80/10/10 ratios). ``dedupe=False``
+    skips hashing entirely for corpora known to be unique.
     """
     raw_path = Path(raw_dir)
     out_path = Path(out_dir)
@@ -17,89 +57,184 @@ def curate_corpus(raw_dir: str, out_dir: str, include_tags: List[str], exclude_t
     if not raw_path.exists():
         raise FileNotFoundError(f"Raw data directory not found: {raw_dir}")
     
-    # Collect all data files
+    # Collect all data files in a single directory pass; JSONL files are
+    # usually the largest, so queue them first for the worker pool
     data_files = []
-    for ext in ['.json', '.jsonl', '.yaml', '.yml']:
-        data_files.extend(raw_path.glob(f"*{ext}"))
+    with os.scandir(raw_path) as entries:
+        for entry in entries:
+            suffix = os.path.splitext(entry.name)[1].lower()
+            if suffix in _DATA_SUFFIXES and entry.is_file():
+                data_files.append((suffix != '.jsonl', entry.name, Path(entry.path)))
+    data_files = [file_path for *_, file_path in sorted(data_files)]
     
     if not data_files:
         raise ValueError(f"No data files found in {raw_dir}")
     
-    # Process each file
-    all_data = []
+    # Process each file, streaming unique items straight into the splits
     seen_hashes = set()
     
-    for file_path in data_files:
-        data = load_data_file(file_path)
-        filtered_data = filter_data(data, include_tags, exclude_tags)
-        deduplicated_data = deduplicate_data(filtered_data, seen_hashes)
-        all_data.extend(deduplicated_data)
-    
-    # Split into train/validation/test
-    train_data, val_data, test_data = split_data(all_data)
-    
-    # Write output files
-    write_jsonl(train_data, out_path / "train.jsonl")
-    write_jsonl(val_data, out_path / "val.jsonl")
-    write_jsonl(test_data, out_path / "test.jsonl")
+    if len(data_files) > 1 and max_workers != 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(
+                _process_data_file, data_files, repeat(include_tags), repeat(exclude_tags), repeat(dedupe)
+            )
+            counts = _write_unique_splits(results, seen_hashes, out_path)
+    else:
+        results = (_process_data_file(f, include_tags, exclude_tags, dedupe) for f in data_files)
+        counts = _write_unique_splits(results, seen_hashes, out_path)
     
     # Write metadata
     metadata = {
-        "total_samples": len(all_data),
-        "train_samples": len(train_data),
-        "val_samples": len(val_data),
-        "test_samples": len(test_data),
+        "total_samples": sum(counts),
+        "train_samples": counts[0],
+        "val_samples": counts[1],
+        "test_samples": counts[2],
         "include_tags": include_tags,
         "exclude_tags": exclude_tags,
         "source_files": [str(f) for f in data_files]
     }
     
-    with open(out_path / "metadata.json", "w") as f:
-        json.dump(metadata, f, indent=2)
+    with open(out_path / "metadata.json", "wb") as f:
+        f.write(orjson.dumps(metadata, option=orjson.OPT_INDENT_2))
+
+def _process_data_file(
+    file_path: Path, include_tags: List[str], exclude_tags: List[str], dedupe: bool = True
+) -> Tuple[List[Dict[str, Any]], Optional[List[int]]]:
+    """Load, filter and (if deduping) hash one file; runs in a worker process."""
+    data = load_data_file(file_path)
+    filtered_data = filter_data(data, include_tags, exclude_tags)
+    if not dedupe:
+        return filtered_data, None
+    return filtered_data, [create_item_hash(item) for item in filtered_data]
+
+def _write_unique_splits(
+    results,
+    seen_hashes: Set[int],
+    out_path: Path,
+    train_ratio: float = 0.8,
+    val_ratio: float = 0.1
+) -> List[int]:
+    """Write unseen items from (items, hashes) results to train/val/test JSONL.
+    
+    The split is chosen from the low bits of each item's content hash, so it
+    is reproducible across runs and needs no in-memory shuffle. Results
+    without hashes (dedupe disabled) are all written, spread over the splits
+    by position. Corpora of at most _EXACT_SPLIT_MAX_ITEMS unique items are
+    held back and split exactly in hash order instead, so small datasets keep
+    the configured ratios. Returns the number of items written to each split.
+    """
+    train_end = int(_SPLIT_BUCKETS * train_ratio)
+    val_end = train_end + int(_SPLIT_BUCKETS * val_ratio)
+    counts = [0, 0, 0]
+    seen_add = seen_hashes.add
+    dumps = orjson.dumps
+    # (hash, line) pairs until the corpus outgrows the exact split
+    pending: Optional[List[Tuple[int, bytes]]] = []
+    
+    with open(out_path / "train.jsonl", "wb") as train_f, \
+            open(out_path / "val.jsonl", "wb") as val_f, \
+            open(out_path / "test.jsonl", "wb") as test_f:
+        writers = (train_f.write, val_f.write, test_f.write)
+        position = 0
+        for items, hashes in results:
+            dedupe = hashes is not None
+            if not dedupe:
+                # Product's high bits, not its low ones (those only see the multiplier's low bits)
+                hashes = [
+                    ((i * _POSITION_SPREAD) & _MASK64) >> _POSITION_SHIFT
+                    for i in range(position, position + len(items))
+                ]
+            position += len(items)
+            
+            for item, item_hash in zip(items, hashes):
+                if dedupe:
+                    if item_hash in seen_hashes:
+                        continue
+                    seen_add(item_hash)
+                
+                line = dumps(item, option=orjson.OPT_NON_STR_KEYS) + b"\n"
+                if pending is not None:
+                    pending.append((item_hash, line))
+                    if len(pending) <= _EXACT_SPLIT_MAX_ITEMS:
+                        continue
+                    # Large corpus after all: bucket everything held so far
+                    for held_hash, held_line in pending:
+                        bucket = held_hash & (_SPLIT_BUCKETS - 1)
+                        split = 0 if bucket < train_end else 1 if bucket < val_end else 2
+                        writers[split](held_line)
+                        counts[split] += 1
+                    pending = None
+                    continue
+                
+                bucket = item_hash & (_SPLIT_BUCKETS - 1)
+                split = 0 if bucket < train_end else 1 if bucket < val_end else 2
+                writers[split](line)
+                counts[split] += 1
+        
+        if pending is not None:
+            # Hash order stands in for a shuffle; the counts match int(n * ratio)
+            pending.sort(key=itemgetter(0))
+            total = len(pending)
+            train_n = int(total * train_ratio)
+            bounds = (train_n, train_n + int(total * val_ratio), total)
+            start = 0
+            for split, end in enumerate(bounds):
+                writers[split](b"".join(line for _, line in pending[start:end]))
+                counts[split] = end - start
+                start = end
+    
+    return counts
 
 def load_data_file(file_path: Path) -> List[Dict[str, Any]]:
     """Load data from various file formats."""
     if file_path.suffix.lower() in ['.yaml', '.yml']:
-        import yaml
-        with open(file_path) as f:
-            return yaml.safe_load(f)
+        from stc.utils.io import load_yaml
+        return load_yaml(file_path)
     elif file_path.suffix.lower() == '.json':
-        with open(file_path) as f:
-            return json.load(f)
+        with open(file_path, "rb") as f:
+            return orjson.loads(f.read())
     elif file_path.suffix.lower() == '.jsonl':
-        data = []
-        with open(file_path) as f:
-            for line in f:
-                if line.strip():
-                    data.append(json.loads(line))
-        return data
+        # Raw byte lines go straight to orjson; isspace() skips blank lines
+        # without the copy strip() would make
+        loads = orjson.loads
+        with open(file_path, "rb") as f:
+            return [loads(line) for line in f if not line.isspace()]
     else:
         raise ValueError(f"Unsupported file format: {file_path.suffix}")
 
 def filter_data(data: List[Dict[str, Any]], include_tags: List[str], exclude_tags: List[str]) -> List[Dict[str, Any]]:
     """Filter data based on tags."""
-    if not include_tags and not exclude_tags:
+    # Empty tags are dropped: "".split(",") gives [""], which would
+    # otherwise only keep items tagged with the empty string
+    include = {tag for tag in include_tags if tag}
+    exclude = {tag for tag in exclude_tags if tag}
+    
+    if not include and not exclude:
         return data
     
+    # Text keywords that can't match either tag set don't need scanning for
+    keywords = tuple(tag for tag in _COMMON_TAGS if tag in include or tag in exclude)
+    
     filtered = []
+    append = filtered.append
     for item in data:
         # Extract tags from item (assuming tags field or metadata)
-        item_tags = extract_tags(item)
+        item_tags = extract_tags(item, keywords)
         
         # Check include tags
-        if include_tags and not any(tag in item_tags for tag in include_tags):
+        if include and include.isdisjoint(item_tags):
             continue
         
         # Check exclude tags
-        if exclude_tags and any(tag in item_tags for tag in exclude_tags):
+        if exclude and not exclude.isdisjoint(item_tags):
             continue
         
-        filtered.append(item)
+        append(item)
     
     return filtered
 
-def extract_tags(item: Dict[str, Any]) -> Set[str]:
-    """Extract tags from a data item."""
+def extract_tags(item: Dict[str, Any], keywords: Tuple[str, ...] = _COMMON_TAGS) -> Set[str]:
+    """Extract tags from a data item, scanning its text for the given keywords."""
     tags = set()
     
     # Common tag locations
@@ -116,35 +251,55 @@ def extract_tags(item: Dict[str, Any]) -> Set[str]:
             tags.update(item['metadata']['tags'].split(','))
     
     # Extract tags from text content (simple keyword matching)
-    if 'text' in item:
+    if keywords and 'text' in item:
         text = item['text'].lower()
-        common_tags = ['pii', 'sensitive', 'private', 'public', 'internal']
-        for tag in common_tags:
-            if tag in text:
-                tags.add(tag)
+        tags.update(tag for tag in keywords if tag in text)
     
     return tags
 
-def deduplicate_data(data: List[Dict[str, Any]], seen_hashes: Set[str]) -> List[Dict[str, Any]]:
-    """Remove duplicate data items."""
-    deduplicated = []
-    
-    for item in data:
-        # Create a hash of the item content
-        item_hash = create_item_hash(item)
-        
-        if item_hash not in seen_hashes:
-            seen_hashes.add(item_hash)
-            deduplicated.append(item)
-    
-    return deduplicated
+def create_item_hash(item: Dict[str, Any]) -> int:
+    """Create a 64-bit hash of an item for deduplication."""
+    # Encode the same view normalize_item() would produce, but straight into
+    # the buffer so no normalized copy of the item is built
+    keys = [key for key in item if key not in _IGNORED_HASH_KEYS]
+    buf = bytearray(b"M%d:" % len(keys))
+    for key in sorted(keys, key=str):
+        value = item[key]
+        if key == 'text' and isinstance(value, str):
+            value = value.strip().lower()
+        _feed_canonical(buf, str(key))
+        _feed_canonical(buf, value)
+    # One stdlib algorithm everywhere: dedupe keys and split buckets must not
+    # depend on which optional packages are installed
+    return int.from_bytes(hashlib.blake2b(buf, digest_size=8).digest(), "little")
 
-def create_item_hash(item: Dict[str, Any]) -> str:
-    """Create a hash of an item for deduplication."""
-    # Normalize the item for hashing
-    normalized = normalize_item(item)
-    item_str = json.dumps(normalized, sort_keys=True)
-    return hashlib.md5(item_str.encode()).hexdigest()
+def _feed_canonical(buf: bytearray, value: Any) -> None:
+    """Append a type-tagged, key-sorted encoding of value to buf."""
+    # Length prefixes keep adjacent values from running together, so
+    # {"a": "bc"} and {"ab": "c"} never share an encoding.
+    if isinstance(value, str):
+        data = value.encode()
+        buf += b"S%d:" % len(data)
+        buf += data
+    elif isinstance(value, bool):
+        buf += b"T" if value else b"F"
+    elif isinstance(value, int):
+        buf += b"I%d;" % value
+    elif isinstance(value, float):
+        buf += b"D" + repr(value).encode() + b";"
+    elif value is None:
+        buf += b"N"
+    elif isinstance(value, dict):
+        buf += b"M%d:" % len(value)
+        for key in sorted(value, key=str):
+            _feed_canonical(buf, str(key))
+            _feed_canonical(buf, value[key])
+    elif isinstance(value, (list, tuple)):
+        buf += b"L%d:" % len(value)
+        for element in value:
+            _feed_canonical(buf, element)
+    else:
+        _feed_canonical(buf, repr(value))
 
 def normalize_item(item: Dict[str, Any]) -> Dict[str, Any]:
     """Normalize an item for consistent hashing."""
@@ -152,7 +307,7 @@ def normalize_item(item: Dict[str, Any]) -> Dict[str, Any]:
     normalized = item.copy()
     
     # Remove common metadata fields
-    for key in ['id', 'created_at', 'updated_at', 'source', 'filename']:
+    for key in _IGNORED_HASH_KEYS:
         normalized.pop(key, None)
     
     # Normalize text content
@@ -160,26 +315,3 @@ def normalize_item(item: Dict[str, Any]) -> Dict[str, Any]:
         normalized['text'] = normalized['text'].strip().lower()
     
     return normalized
-
-def split_data(data: List[Dict[str, Any]], train_ratio: float = 0.8, val_ratio: float = 0.1) -> tuple:
-    """Split data into train/validation/test sets."""
-    import random
-    
-    # Shuffle data
-    random.shuffle(data)
-    
-    total = len(data)
-    train_end = int(total * train_ratio)
-    val_end = train_end + int(total * val_ratio)
-    
-    train_data = data[:train_end]
-    val_data = data[train_end:val_end]
-    test_data = data[val_end:]
-    
-    return train_data, val_data, test_data
-
-def write_jsonl(data: List[Dict[str, Any]], file_path: Path) -> None:
-    """Write data to JSONL format."""
-    with open(file_path, "w") as f:
-        for item in data:
-            f.write(json.dumps(item) + "\n") 
\ No newline at end of file
@@ -4,7 +4,14 @@ import re
 from typing import List, Dict, Any, Callable, Optional
 from dataclasses import dataclass
 
-@dataclass
+# Fields probed, in order, for an item's text and quality score
+_TEXT_FIELDS = ('text', 'content', 'message', 'description', 'summary')
+_SCORE_FIELDS = ('quality_score', 'score', 'confidence', 'quality')
+
+# Numbered group references (\1, \g<1>, (?(1)...)); joining patterns renumbers groups
+_NUMBERED_GROUP_REF = re.compile(r'\\(?:[1-9]|g<\d)|\(\?\(\d')
+
+@dataclass(slots=True)
 class FilterConfig:
     """Configuration for data filtering."""
     min_length: Optional[int] = None
@@ -25,10 +32,15 @@ class FilterConfig:
 class DataFilter:
     """Filter for data quality and relevance."""
     
+    __slots__ = ("config", "forbidden_regex", "allowed_regex", "_forbidden_union", "_allowed_union")
+    
     def __init__(self, config: FilterConfig):
         self.config = config
         self.forbidden_regex = [re.compile(pattern) for pattern in config.forbidden_patterns]
         self.allowed_regex = [re.compile(pattern) for pattern in config.allowed_patterns]
+        # One alternation per set so each text is scanned once, not once per pattern
+        self._forbidden_union = _union_regex(config.forbidden_patterns)
+        self._allowed_union = _union_regex(config.allowed_patterns)
     
     def filter_item(self, item: Dict[str, Any]) -> bool:
         """Check if an item passes all filters."""
@@ -37,20 +49,23 @@ class DataFilter:
             if not self._check_required_fields(item):
                 return False
             
+            # Check quality score (cheap, so before any text scanning)
+            if not self._check_quality_score(item):
+                return False
+            
+            # Extract the text once for all text-based checks
+            text = self._extract_text(item)
+            
             # Check length constraints
-            if not self._check_length_constraints(item):
+            if not self._check_length_constraints(text):
                 return False
             
             # Check forbidden patterns
-            if not self._check_forbidden_patterns(item):
+            if not self._check_forbidden_patterns(text):
                 return False
             
             # Check allowed patterns
-            if not self._check_allowed_patterns(item):
-                return False
-            
-            # Check quality score
-            if not self._check_quality_score(item):
+            if not self._check_allowed_patterns(text):
                 return False
             
             return True
@@ -65,9 +80,8 @@ class DataFilter:
                 return False
         return True
     
-    def _check_length_constraints(self, item: Dict[str, Any]) -> bool:
+    def _check_length_constraints(self, text: str) -> bool:
         """Check text length constraints."""
-        text = self._extract_text(item)
         if not text:
             return True  # No text to check
         
@@ -81,27 +95,31 @@ class DataFilter:
         
         return True
     
-    def _check_forbidden_patterns(self, item: Dict[str, Any]) -> bool:
-        """Check if item contains forbidden patterns."""
-        text = self._extract_text(item)
+    def _check_forbidden_patterns(self, text: str) -> bool:
+        """Check if text contains forbidden patterns."""
         if not text:
             return True
         
+        if self._forbidden_union is not None:
+            return self._forbidden_union.search(text) is None
+        
         for pattern in self.forbidden_regex:
             if pattern.search(text):
                 return False
         
         return True
     
-    def _check_allowed_patterns(self, item: Dict[str, Any]) -> bool:
-        """Check if item matches allowed patterns."""
+    def _check_allowed_patterns(self, text: str) -> bool:
+        """Check if text matches allowed patterns."""
         if not self.allowed_regex:
             return True  # No restrictions
         
-        text = self._extract_text(item)
         if not text:
             return False
         
+        if self._allowed_union is not None:
+            return self._allowed_union.search(text) is not None
+        
         for pattern in self.allowed_regex:
             if pattern.search(text):
                 return True
@@ -119,9 +137,7 @@ class DataFilter:
     def _extract_text(self, item: Dict[str, Any]) -> str:
         """Extract text content from item."""
         # Common text field names
-        text_fields = ['text', 'content', 'message', 'description', 'summary']
-        
-        for field in text_fields:
+        for field in _TEXT_FIELDS:
             if field in item and item[field]:
                 return str(item[field])
         
@@ -135,9 +151,7 @@ class DataFilter:
     def _extract_quality_score(self, item: Dict[str, Any]) -> float:
         """Extract quality score from item."""
         # Common quality score field names
-        score_fields = ['quality_score', 'score', 'confidence', 'quality']
-        
-        for field in score_fields:
+        for field in _SCORE_FIELDS:
             if field in item:
                 try:
                     return float(item[field])
@@ -147,6 +161,19 @@ class DataFilter:
         # Default quality score
         return 1.0
 
+def _union_regex(patterns: List[str]) -> Optional[re.Pattern]:
+    """Compile patterns into a single alternation, or None if they can't be combined."""
+    if not patterns:
+        return None
+    if any(_NUMBERED_GROUP_REF.search(pattern) for pattern in patterns):
+        return None
+    
+    try:
+        return re.compile("|".join(f"(?:{pattern})" for pattern in patterns))
+    except re.error:
+        # e.g. inline global flags or duplicate group names; match one by one
+        return None
+
 def create_ontology_filter(ontology) -> DataFilter:
     """Create a filter based on ontology constraints."""
     config = FilterConfig()
@@ -1,7 +1,17 @@
 """Deployment module."""
 
-from .packager import build_bundle, validate_bundle
-from .runtime import RuntimeValidator, RuntimeMiddleware, ModelRuntime, create_runtime
+import importlib
+
+# Submodules are imported on first attribute access so `import stc.deploy`
+# doesn't pull in tarfile/shutil or jsonschema up front.
+_LAZY_ATTRS = {
+    "build_bundle": ".packager",
+    "validate_bundle": ".packager",
+    "RuntimeValidator": ".runtime",
+    "RuntimeMiddleware": ".runtime",
+    "ModelRuntime": ".runtime",
+    "create_runtime": ".runtime",
+}
 
 __all__ = [
     "build_bundle",
@@ -10,4 +20,15 @@ __all__ = [
     "RuntimeMiddleware",
     "ModelRuntime",
     "create_runtime"
-] 
\ No newline at end of file
+]
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        module = importlib.import_module(_LAZY_ATTRS[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
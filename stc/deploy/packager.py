@@ -1,12 +1,29 @@
 """Container and bundle builder for deployment."""
 
-import json
+import os
+import orjson
 import shutil
 import tarfile
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 from stc.config import ensure_dir
 
+try:
+    import fcntl
+except ImportError:  # non-POSIX: no reflinks, hardlink or copy instead
+    fcntl = None
+
+try:
+    import zstandard
+except ImportError:  # bundles fall back to .tar.gz
+    zstandard = None
+
+# ioctl request for a copy-on-write clone of a whole file (Linux, btrfs/XFS)
+_FICLONE = 0x40049409
+
+# Block size for streamed tar archives; model weights are large sequential files
+_TAR_BUFSIZE = 1 << 20
+
 def build_bundle(model_path: str, schema_path: str, output_path: Optional[str] = None) -> str:
     """Build a deployable bundle with model and validators."""
     
@@ -30,19 +47,20 @@ def build_bundle(model_path: str, schema_path: str, output_path: Optional[str] =
     model_dest = bundle_path / "model"
     ensure_dir(model_dest)
     
+    # Weights can be tens of GB, so stage them by reflink/hardlink when possible
     if model_path.is_file():
-        shutil.copy2(model_path, model_dest)
+        _link_or_copy(model_path, model_dest / model_path.name)
     else:
-        shutil.copytree(model_path, model_dest, dirs_exist_ok=True)
+        _link_or_copy_tree(model_path, model_dest)
     
     # Copy schema files
     schema_dest = bundle_path / "schema"
     ensure_dir(schema_dest)
     
     if schema_path.is_file():
-        shutil.copy2(schema_path, schema_dest)
+        _link_or_copy(schema_path, schema_dest / schema_path.name)
     else:
-        shutil.copytree(schema_path, schema_dest, dirs_exist_ok=True)
+        _link_or_copy_tree(schema_path, schema_dest)
     
     # Create runtime configuration
     runtime_config = {
@@ -58,8 +76,8 @@ def build_bundle(model_path: str, schema_path: str, output_path: Optional[str] =
         ]
     }
     
-    with open(bundle_path / "runtime_config.json", "w") as f:
-        json.dump(runtime_config, f, indent=2)
+    with open(bundle_path / "runtime_config.json", "wb") as f:
+        f.write(orjson.dumps(runtime_config, option=orjson.OPT_INDENT_2))
     
     # Create Dockerfile
     dockerfile_content = generate_dockerfile(runtime_config)
@@ -86,14 +104,46 @@ def build_bundle(model_path: str, schema_path: str, output_path: Optional[str] =
         "files": list_files_recursive(bundle_path)
     }
     
-    with open(bundle_path / "manifest.json", "w") as f:
-        json.dump(manifest, f, indent=2)
+    with open(bundle_path / "manifest.json", "wb") as f:
+        f.write(orjson.dumps(manifest, option=orjson.OPT_INDENT_2))
     
     # Create compressed archive
     archive_path = create_archive(bundle_path)
     
     return str(archive_path)
 
+def _link_or_copy(src: Path, dst: Path) -> None:
+    """Stage src at dst as a reflink, else a hardlink, else a full copy."""
+    if os.path.lexists(dst):
+        os.unlink(dst)
+    
+    if fcntl is not None:
+        try:
+            with open(src, "rb") as f_src, open(dst, "wb") as f_dst:
+                fcntl.ioctl(f_dst.fileno(), _FICLONE, f_src.fileno())
+            shutil.copystat(src, dst)
+            return
+        except OSError:
+            # Filesystem without reflink support (or cross-device)
+            os.unlink(dst)
+    
+    try:
+        os.link(src, dst)
+        return
+    except OSError:
+        pass
+    
+    shutil.copy2(src, dst)
+
+def _link_or_copy_tree(src: Path, dst: Path) -> None:
+    """Like shutil.copytree(dirs_exist_ok=True), staging files with _link_or_copy."""
+    for root, dirs, files in os.walk(src):
+        dest_root = dst / os.path.relpath(root, src)
+        for name in dirs:
+            os.makedirs(dest_root / name, exist_ok=True)
+        for name in files:
+            _link_or_copy(Path(root) / name, dest_root / name)
+
 def generate_dockerfile(config: Dict[str, Any]) -> str:
     """Generate Dockerfile for the bundle."""
     return f"""# Dockerfile for {config.get('name', 'semantic-toolchain')} bundle
@@ -219,23 +269,37 @@ if __name__ == "__main__":
 
 def list_files_recursive(directory: Path) -> List[str]:
     """List all files in directory recursively."""
+    # os.walk + prefix slicing avoids a Path and an is_file() stat per entry
+    base = os.path.join(str(directory), "")
+    prefix_len = len(base)
     files = []
-    for item in directory.rglob("*"):
-        if item.is_file():
-            files.append(str(item.relative_to(directory)))
+    for root, _, names in os.walk(base):
+        for name in names:
+            files.append(os.path.join(root, name)[prefix_len:])
     return files
 
 def create_archive(bundle_path: Path) -> Path:
-    """Create a compressed archive of the bundle."""
-    archive_path = bundle_path.with_suffix(".tar.gz")
-    
-    with tarfile.open(archive_path, "w:gz") as tar:
-        tar.add(bundle_path, arcname=bundle_path.name)
+    """Create a compressed archive of the bundle.
+    
+    Uses multi-threaded zstd (``.tar.zst``) when ``zstandard`` is installed,
+    otherwise gzip (``.tar.gz``).
+    """
+    if zstandard is None:
+        archive_path = bundle_path.with_suffix(".tar.gz")
+        with tarfile.open(archive_path, "w:gz") as tar:
+            tar.add(bundle_path, arcname=bundle_path.name)
+        return archive_path
+    
+    archive_path = bundle_path.with_suffix(".tar.zst")
+    cctx = zstandard.ZstdCompressor(level=10, threads=-1)
+    with open(archive_path, "wb") as raw, cctx.stream_writer(raw) as zf:
+        with tarfile.open(fileobj=zf, mode="w|", bufsize=_TAR_BUFSIZE) as tar:
+            tar.add(bundle_path, arcname=bundle_path.name)
     
     return archive_path
 
 def extract_bundle(archive_path: str, extract_to: Optional[str] = None) -> str:
-    """Extract a bundle archive."""
+    """Extract a bundle archive (.tar.zst or .tar.gz)."""
     archive_path = Path(archive_path)
     
     if not archive_path.exists():
@@ -247,8 +311,16 @@ def extract_bundle(archive_path: str, extract_to: Optional[str] = None) -> str:
     extract_path = Path(extract_to)
     ensure_dir(extract_path)
     
-    with tarfile.open(archive_path, "r:gz") as tar:
-        tar.extractall(extract_path)
+    if archive_path.suffix == ".zst":
+        if zstandard is None:
+            raise ImportError("zstandard is required to extract .tar.zst bundles")
+        dctx = zstandard.ZstdDecompressor()
+        with open(archive_path, "rb") as raw, dctx.stream_reader(raw) as zf:
+            with tarfile.open(fileobj=zf, mode="r|", bufsize=_TAR_BUFSIZE) as tar:
+                tar.extractall(extract_path)
+    else:
+        with tarfile.open(archive_path, "r:gz") as tar:
+            tar.extractall(extract_path)
     
     return str(extract_path)
 
@@ -280,8 +352,8 @@ def validate_bundle(bundle_path: str) -> List[str]:
     
     # Validate runtime config
     try:
-        with open(bundle_path / "runtime_config.json") as f:
-            config = json.load(f)
+        with open(bundle_path / "runtime_config.json", "rb") as f:
+            config = orjson.loads(f.read())
         
         required_config_keys = ["model_path", "schema_path", "runtime_type"]
         for key in required_config_keys:
@@ -1,14 +1,24 @@
 """Runtime validators and middleware for deployment."""
 
+import atexit
 import json
 import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+import orjson
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Callable
+from typing import Dict, Any, List, Optional, Callable, Sequence
+from concurrent.futures import Future
 from dataclasses import dataclass
+from functools import lru_cache
+from itertools import islice
 import jsonschema
 from jsonschema import Draft7Validator
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class RuntimeConfig:
     """Configuration for runtime validation."""
     schema_path: str
@@ -16,20 +26,69 @@ class RuntimeConfig:
     enable_logging: bool = True
     fail_closed: bool = True
     max_validation_errors: int = 10
+    # Opt-in: torch.compile of model.forward on CUDA, falling back to eager on failure
+    compile_model: bool = False
+
+# Shared, immutable result for successful validations (no per-call allocation)
+_EMPTY_ERRORS: tuple[str, ...] = ()
+_OK: tuple[bool, Sequence[str]] = (True, _EMPTY_ERRORS)
+
+# Background listener that owns the real stc_runtime handler; started lazily, once
+_log_listener: Optional[logging.handlers.QueueListener] = None
+# Validators may be built concurrently (server worker threads); only one may start it
+_log_listener_lock = threading.Lock()
+
+def _runtime_log_queue() -> queue.Queue:
+    """Start the shared log listener thread if needed and return its queue."""
+    global _log_listener
+    with _log_listener_lock:
+        if _log_listener is None:
+            handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter(
+                '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+            ))
+            listener = logging.handlers.QueueListener(queue.Queue(-1), handler)
+            listener.start()
+            # Flush anything still queued when the process exits
+            atexit.register(listener.stop)
+            _log_listener = listener
+        return _log_listener.queue
+
+@lru_cache(maxsize=32)
+def _compiled_validator(schema_key: bytes) -> Draft7Validator:
+    """Build a validator for canonical (key-sorted) schema bytes, shared across instances."""
+    return Draft7Validator(orjson.loads(schema_key))
+
+@lru_cache(maxsize=32)
+def _load_and_compile(path: str, mtime_ns: int) -> tuple[Dict[str, Any], Draft7Validator]:
+    """Read and compile a schema file; mtime_ns in the key invalidates on edits."""
+    with open(path, "rb") as f:
+        schema = orjson.loads(f.read())
+    # Equal schemas share one validator even when loaded from different paths
+    return schema, _compiled_validator(orjson.dumps(schema, option=orjson.OPT_SORT_KEYS))
+
+@lru_cache(maxsize=8)
+def _stat_and_parse(path: str, mtime_ns: int) -> bool:
+    """Confirm a schema file parses; cached so unchanged files cost only a stat."""
+    with open(path, "rb") as f:
+        orjson.loads(f.read())
+    return True
 
 class RuntimeValidator:
     """Runtime validator for schema enforcement."""
     
+    __slots__ = ("config", "schema", "validator", "logger", "_iter_errors")
+    
     def __init__(self, config: RuntimeConfig):
         self.config = config
-        self.schema = self._load_schema()
-        self.validator = Draft7Validator(self.schema)
+        self.schema, self.validator = self._load_schema()
+        self._iter_errors = self.validator.iter_errors
         self.logger = self._setup_logger()
     
-    def _load_schema(self) -> Dict[str, Any]:
-        """Load JSON schema from file."""
-        with open(self.config.schema_path) as f:
-            return json.load(f)
+    def _load_schema(self) -> tuple[Dict[str, Any], Draft7Validator]:
+        """Load JSON schema from file, reusing the compiled form while unchanged."""
+        path = self.config.schema_path
+        return _load_and_compile(path, os.stat(path).st_mtime_ns)
     
     def _setup_logger(self) -> logging.Logger:
         """Setup logging for the runtime."""
@@ -37,70 +96,71 @@ class RuntimeValidator:
         logger.setLevel(logging.INFO)
         
         if not logger.handlers:
-            handler = logging.StreamHandler()
-            formatter = logging.Formatter(
-                '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-            )
-            handler.setFormatter(formatter)
-            logger.addHandler(handler)
+            # Request threads only enqueue records; stream I/O happens on the
+            # listener thread so a slow stderr never stalls validation
+            logger.addHandler(logging.handlers.QueueHandler(_runtime_log_queue()))
         
         return logger
     
-    def validate_input(self, data: Dict[str, Any]) -> tuple[bool, List[str]]:
-        """Validate input data against schema."""
-        if not self.config.enable_validation:
-            return True, []
+    def _collect_errors(self, data: Dict[str, Any]) -> Sequence[str]:
+        """Return up to max_validation_errors messages, or () if data is valid."""
+        # is_valid() stops at the first failure and builds no error objects,
+        # which is the whole cost on the (common) success path
+        if self.validator.is_valid(data):
+            return _EMPTY_ERRORS
         
-        try:
-            errors = list(self.validator.iter_errors(data))
-            error_messages = [str(error) for error in errors[:self.config.max_validation_errors]]
-            
-            if errors:
-                self.logger.warning(f"Input validation failed: {error_messages}")
-                if self.config.fail_closed:
-                    return False, error_messages
-            
-            return True, error_messages
-        except Exception as e:
-            error_msg = f"Validation error: {e}"
-            self.logger.error(error_msg)
-            if self.config.fail_closed:
-                return False, [error_msg]
-            return True, [error_msg]
+        errors = islice(self._iter_errors(data), self.config.max_validation_errors)
+        return [f"{error.json_path}: {error.message}" for error in errors]
     
-    def validate_output(self, data: Dict[str, Any]) -> tuple[bool, List[str]]:
-        """Validate output data against schema."""
-        if not self.config.enable_validation:
-            return True, []
+    def _validate(self, data: Dict[str, Any], direction: str) -> tuple[bool, Sequence[str]]:
+        """Validate data against schema; direction labels log messages."""
+        config = self.config
+        if not config.enable_validation:
+            return _OK
         
+        fail_closed = config.fail_closed
         try:
-            errors = list(self.validator.iter_errors(data))
-            error_messages = [str(error) for error in errors[:self.config.max_validation_errors]]
+            error_messages = self._collect_errors(data)
+            if not error_messages:
+                return _OK
             
-            if errors:
-                self.logger.warning(f"Output validation failed: {error_messages}")
-                if self.config.fail_closed:
-                    return False, error_messages
+            if config.enable_logging:
+                self.logger.warning("%s validation failed: %s", direction, error_messages)
+            if fail_closed:
+                return False, error_messages
             
             return True, error_messages
         except Exception as e:
             error_msg = f"Validation error: {e}"
-            self.logger.error(error_msg)
-            if self.config.fail_closed:
+            if config.enable_logging:
+                self.logger.error("%s", error_msg)
+            if fail_closed:
                 return False, [error_msg]
             return True, [error_msg]
+    
+    def validate_input(self, data: Dict[str, Any]) -> tuple[bool, Sequence[str]]:
+        """Validate input data against schema."""
+        return self._validate(data, "Input")
+    
+    def validate_output(self, data: Dict[str, Any]) -> tuple[bool, Sequence[str]]:
+        """Validate output data against schema."""
+        return self._validate(data, "Output")
 
 class RuntimeMiddleware:
     """Middleware for request/response validation."""
     
-    def __init__(self, validator: RuntimeValidator):
+    __slots__ = ("validator", "model_runtime")
+    
+    def __init__(self, validator: RuntimeValidator, model_runtime: Optional["ModelRuntime"] = None):
         self.validator = validator
+        # Owned runtime, shut down by close()
+        self.model_runtime = model_runtime
     
-    def validate_request(self, request_data: Dict[str, Any]) -> tuple[bool, List[str]]:
+    def validate_request(self, request_data: Dict[str, Any]) -> tuple[bool, Sequence[str]]:
         """Validate incoming request data."""
         return self.validator.validate_input(request_data)
     
-    def validate_response(self, response_data: Dict[str, Any]) -> tuple[bool, List[str]]:
+    def validate_response(self, response_data: Dict[str, Any]) -> tuple[bool, Sequence[str]]:
         """Validate outgoing response data."""
         return self.validator.validate_output(response_data)
     
@@ -118,35 +178,185 @@ class RuntimeMiddleware:
         is_valid, errors = self.validate_response(response_data)
         
         if not is_valid:
-            self.validator.logger.warning(f"Response validation failed: {errors}")
+            self.validator.logger.warning("Response validation failed: %s", errors)
             # In fail-closed mode, we might want to return an error response
             # instead of the invalid data
         
         return response_data
+    
+    def close(self) -> None:
+        """Shut down the model runtime's batch worker, if there is one."""
+        if self.model_runtime is not None:
+            self.model_runtime.close()
+
+# Queued after the last request to tell the batch worker to exit
+_STOP = object()
+
+# Tokens generated per request; a per-row budget, so unaffected by batch padding
+_MAX_NEW_TOKENS = 512
+
+class _BatchScheduler:
+    """Coalesce concurrent requests into batched calls on a worker thread."""
+    
+    __slots__ = ("_run_batch", "max_batch_size", "max_wait", "_queue", "_thread", "_lock", "_closed")
+    
+    def __init__(self, run_batch: Callable[[List[str]], List[Dict[str, Any]]],
+                 max_batch_size: int = 8, max_wait_ms: float = 2.0):
+        self._run_batch = run_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: queue.Queue = queue.Queue()
+        # Guards _closed so nothing is queued behind the stop marker
+        self._lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._worker, name="stc-batcher", daemon=True)
+        self._thread.start()
+    
+    def submit(self, formatted_input: str) -> Future:
+        """Queue one input; the future resolves to its parsed output."""
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Batch scheduler is closed")
+            self._queue.put((formatted_input, future))
+        return future
+    
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Stop accepting requests, finish the queued ones and join the worker."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join(timeout)
+    
+    def _next_batch(self) -> tuple[List[tuple[str, Future]], bool]:
+        """Block for one request, then gather more until full or max_wait elapses.
+        
+        The flag is True once the stop marker has been reached.
+        """
+        get = self._queue.get
+        first = get()
+        if first is _STOP:
+            return [], True
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+    
+    def _worker(self) -> None:
+        """Run batches until closed, resolving each request's future."""
+        while True:
+            batch, stopping = self._next_batch()
+            if batch:
+                self._resolve(batch)
+            if stopping:
+                return
+    
+    def _resolve(self, batch: List[tuple[str, Future]]) -> None:
+        """Run one batch and settle every future in it, successfully or not."""
+        try:
+            outputs = self._run_batch([formatted for formatted, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        
+        if len(outputs) != len(batch):
+            # Outputs can't be matched to requests; no caller may be left waiting
+            error = RuntimeError(f"Batch returned {len(outputs)} outputs for {len(batch)} requests")
+            for _, future in batch:
+                future.set_exception(error)
+            return
+        
+        for (_, future), output in zip(batch, outputs):
+            future.set_result(output)
 
 class ModelRuntime:
     """Runtime for model inference with validation."""
     
-    def __init__(self, model_path: str, validator: RuntimeValidator):
+    def __init__(self, model_path: str, validator: RuntimeValidator,
+                 max_batch_size: int = 8, max_wait_ms: float = 2.0):
         self.model_path = Path(model_path)
         self.validator = validator
         self.model = None
         self.tokenizer = None
         self._load_model()
+        # Concurrent predict() calls share generate() launches
+        self._scheduler = _BatchScheduler(self._generate_batch, max_batch_size, max_wait_ms)
     
     def _load_model(self):
         """Load the trained model."""
         try:
+            import torch
             from transformers import AutoModelForCausalLM, AutoTokenizer
             
-            self.tokenizer = AutoTokenizer.from_pretrained(self.model_path)
-            self.model = AutoModelForCausalLM.from_pretrained(self.model_path)
+            # Half-precision weights on GPU halve memory traffic per decode step
+            if torch.cuda.is_available():
+                device = torch.device("cuda")
+                dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+            else:
+                device = torch.device("cpu")
+                dtype = torch.float32
+            
+            self.tokenizer = AutoTokenizer.from_pretrained(self.model_path, use_fast=True)
+            # accelerate (a declared dependency) places weights straight onto the GPU(s)
+            device_map = "auto" if device.type == "cuda" else None
+            self.model = AutoModelForCausalLM.from_pretrained(self.model_path, torch_dtype=dtype, device_map=device_map)
+            self.model.eval()
+            
+            # generate() calls forward() once per token; compiling it fuses the
+            # per-step kernels. torch.compile is lazy, so failures surface on the
+            # first call and _compile_forward falls back to eager there.
+            if self.validator.config.compile_model and device.type == "cuda" and hasattr(torch, "compile"):
+                self._compile_forward(torch)
+            
+            # Batched generation pads prompts; decoder-only models need left padding
+            if self.tokenizer.pad_token is None:
+                self.tokenizer.pad_token = self.tokenizer.eos_token
+            self.tokenizer.padding_side = "left"
             
-            self.validator.logger.info(f"Model loaded from {self.model_path}")
+            # Ontology-derived prompts recur; cache their token ids per runtime
+            self._encode = lru_cache(maxsize=1024)(self._encode_prompt)
+            
+            self.validator.logger.info("Model loaded from %s", self.model_path)
         except Exception as e:
-            self.validator.logger.error(f"Failed to load model: {e}")
+            self.validator.logger.error("Failed to load model: %s", e)
             raise
     
+    def _compile_forward(self, torch) -> None:
+        """Swap in a compiled forward, reverting to eager if its first call fails."""
+        model = self.model
+        eager = model.forward
+        # dynamic=True: generate() grows the sequence every step, which would
+        # otherwise recompile per length (or re-record CUDA graphs in reduce-overhead)
+        compiled = torch.compile(eager, dynamic=True)
+        logger = self.validator.logger
+        
+        def first_call(*args, **kwargs):
+            try:
+                result = compiled(*args, **kwargs)
+            except Exception as e:
+                logger.warning("torch.compile failed, using eager model: %s", e)
+                model.forward = eager
+                return eager(*args, **kwargs)
+            model.forward = compiled
+            return result
+        
+        model.forward = first_call
+    
+    def close(self) -> None:
+        """Stop the batch worker after the requests already queued."""
+        self._scheduler.close()
+    
     def predict(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Make a prediction with validation."""
         # Validate input
@@ -159,16 +369,16 @@ class ModelRuntime:
         
         # Generate prediction
         try:
-            output = self._generate_output(formatted_input)
+            output = self._scheduler.submit(formatted_input).result()
             
             # Validate output
             is_valid, errors = self.validator.validate_output(output)
             if not is_valid:
-                self.validator.logger.warning(f"Output validation failed: {errors}")
+                self.validator.logger.warning("Output validation failed: %s", errors)
             
             return output
         except Exception as e:
-            self.validator.logger.error(f"Prediction failed: {e}")
+            self.validator.logger.error("Prediction failed: %s", e)
             raise
     
     def _format_input(self, input_data: Dict[str, Any]) -> str:
@@ -180,6 +390,7 @@ class ModelRuntime:
                 if isinstance(value, str):
                     lines.append(f"{key}: {value}")
                 else:
+                    # stdlib json on purpose: must match trainer.format_input's prompt text
                     lines.append(f"{key}: {json.dumps(value)}")
             return "\n".join(lines)
         else:
@@ -187,87 +398,149 @@ class ModelRuntime:
     
     def _generate_output(self, formatted_input: str) -> Dict[str, Any]:
         """Generate output from formatted input."""
+        return self._generate_batch([formatted_input])[0]
+    
+    def _encode_prompt(self, formatted_input: str) -> tuple[int, ...]:
+        """Tokenize one prompt to an immutable id sequence (cached via self._encode)."""
+        encoded = self.tokenizer(formatted_input, truncation=True, max_length=2048)
+        return tuple(encoded["input_ids"])
+    
+    def _generate_batch(self, formatted_inputs: List[str]) -> List[Dict[str, Any]]:
+        """Generate outputs for several formatted inputs in one generate() call."""
         import torch
         
-        # Tokenize input
-        inputs = self.tokenizer(
-            formatted_input,
-            return_tensors="pt",
-            truncation=True,
-            max_length=2048
-        )
+        # Tokenize inputs (cached per prompt), then pad them into one batch
+        encode = self._encode
+        inputs = self.tokenizer.pad(
+            {"input_ids": [list(encode(text)) for text in formatted_inputs]},
+            padding=True,
+            return_tensors="pt"
+        ).to(self.model.device)
         
         # Generate output
-        with torch.no_grad():
+        with torch.inference_mode():
             outputs = self.model.generate(
                 inputs.input_ids,
-                max_length=512,
+                attention_mask=inputs.attention_mask,
+                max_new_tokens=_MAX_NEW_TOKENS,
                 do_sample=True,
                 temperature=0.7,
-                pad_token_id=self.tokenizer.eos_token_id,
+                use_cache=True,
+                pad_token_id=self.tokenizer.pad_token_id,
                 eos_token_id=self.tokenizer.eos_token_id,
             )
         
         # Decode output
-        generated_text = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
+        generated_texts = self.tokenizer.batch_decode(outputs, skip_special_tokens=True)
+        return [self._parse_output(text) for text in generated_texts]
+    
+    @staticmethod
+    def _parse_output(generated_text: str) -> Dict[str, Any]:
+        """Parse the outermost {...} span of generated text, falling back to a text wrapper."""
+        # Model output often wraps the JSON in prose; only the span from the
+        # first '{' to the last '}' can parse, so don't hand orjson the rest
+        start = generated_text.find("{")
+        end = generated_text.rfind("}")
+        if start != -1 and end > start:
+            try:
+                return orjson.loads(generated_text[start:end + 1])
+            except orjson.JSONDecodeError:
+                pass
         
-        # Try to parse as JSON
-        try:
-            return json.loads(generated_text)
-        except json.JSONDecodeError:
-            # If not valid JSON, return as text
-            return {"text": generated_text}
+        # If not valid JSON, return as text
+        return {"text": generated_text}
 
 class HealthChecker:
     """Health checker for runtime monitoring."""
     
+    # Minimum seconds between deep (model predict) checks
+    DEEP_CHECK_INTERVAL = 30.0
+    
+    __slots__ = ("validator", "model_runtime", "_schema_path", "_schema_mtime",
+                 "_schema_checks", "_deep_checked_at", "_deep_result")
+    
     def __init__(self, validator: RuntimeValidator, model_runtime: Optional[ModelRuntime] = None):
         self.validator = validator
         self.model_runtime = model_runtime
+        self._schema_path = Path(validator.config.schema_path)
+        self._schema_mtime: Optional[int] = None
+        self._schema_checks: tuple[bool, bool, Sequence[str]] = (True, True, _EMPTY_ERRORS)
+        self._deep_checked_at: Optional[float] = None
+        self._deep_result: tuple[bool, Sequence[str]] = (False, _EMPTY_ERRORS)
+        self._refresh_schema_checks()
     
-    def check_health(self) -> Dict[str, Any]:
-        """Check the health of the runtime."""
-        health_status = {
-            "status": "healthy",
-            "validator": True,
-            "model": False,
-            "schema": True,
-            "errors": []
-        }
+    def _refresh_schema_checks(self) -> None:
+        """Re-run the validator probe and schema parse; cached until the schema changes."""
+        validator_ok, schema_ok, errors = True, True, []
         
         # Check validator
         try:
             # Test validation with sample data
             test_data = {"type": "test", "field": "value"}
-            is_valid, errors = self.validator.validate_input(test_data)
+            is_valid, probe_errors = self.validator.validate_input(test_data)
             if not is_valid:
-                health_status["validator"] = False
-                health_status["errors"].append(f"Validator test failed: {errors}")
+                validator_ok = False
+                errors.append(f"Validator test failed: {probe_errors}")
         except Exception as e:
-            health_status["validator"] = False
-            health_status["errors"].append(f"Validator error: {e}")
-        
-        # Check model
-        if self.model_runtime:
-            try:
-                # Test model with sample input
-                test_input = {"input": "test"}
-                output = self.model_runtime.predict(test_input)
-                health_status["model"] = True
-            except Exception as e:
-                health_status["model"] = False
-                health_status["errors"].append(f"Model error: {e}")
+            validator_ok = False
+            errors.append(f"Validator error: {e}")
         
         # Check schema
         try:
-            with open(self.validator.config.schema_path) as f:
-                json.load(f)
+            self._schema_mtime = self._schema_path.stat().st_mtime_ns
+            _stat_and_parse(str(self._schema_path), self._schema_mtime)
+        except (OSError, orjson.JSONDecodeError) as e:
+            self._schema_mtime = None
+            schema_ok = False
+            errors.append(f"Schema error: {e}")
+        
+        self._schema_checks = (validator_ok, schema_ok, tuple(errors))
+    
+    def _check_model(self) -> tuple[bool, Sequence[str]]:
+        """Run a sample predict, at most once per DEEP_CHECK_INTERVAL."""
+        now = time.monotonic()
+        if self._deep_checked_at is not None and now - self._deep_checked_at < self.DEEP_CHECK_INTERVAL:
+            return self._deep_result
+        
+        try:
+            # Test model with sample input
+            test_input = {"input": "test"}
+            self.model_runtime.predict(test_input)
+            result = _OK
         except Exception as e:
-            health_status["schema"] = False
-            health_status["errors"].append(f"Schema error: {e}")
+            result = (False, (f"Model error: {e}",))
+        
+        self._deep_checked_at = now
+        self._deep_result = result
+        return result
+    
+    def check_health(self, deep: bool = False) -> Dict[str, Any]:
+        """Check the health of the runtime; deep=True also exercises the model."""
+        # A stat is all a probe costs while the schema file is unchanged
+        try:
+            mtime = self._schema_path.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime is None or mtime != self._schema_mtime:
+            self._refresh_schema_checks()
+        
+        validator_ok, schema_ok, errors = self._schema_checks
+        health_status = {
+            "status": "healthy",
+            "validator": validator_ok,
+            "model": False,
+            "schema": schema_ok,
+            "errors": list(errors)
+        }
+        
+        # Check model
+        if deep and self.model_runtime:
+            model_ok, model_errors = self._check_model()
+            health_status["model"] = model_ok
+            health_status["errors"].extend(model_errors)
         
         # Overall status
-        if not all([health_status["validator"], health_status["schema"]]):
+        if not (validator_ok and schema_ok):
             health_status["status"] = "unhealthy"
         
         return health_status
@@ -2,6 +2,37 @@ from pathlib import Path
 from typing import Dict, Any, List
 from stc.ontology.models import Ontology
 from stc.config import ensure_dir
+from stc.utils.io import write_bytes
+
+# Per-field rule block, rendered in one format_map() call per field
+_FIELD_RULES = (
+    "# {f} field\n"
+    "{lc}_{f}_pair <- '\"{f}\"' ':' {lc}_{f}_value\n"
+    "{lc}_{f}_value <- {rule}\n"
+)
+
+def _value_rule(fspec) -> str:
+    """Return the PEG expression a field's value must match."""
+    # Value validation based on field type
+    if fspec.enum:
+        return " / ".join(f"'{val}'" for val in fspec.enum)
+    
+    field_type = fspec.type
+    if field_type == "string":
+        if fspec.range:
+            min_len, max_len = fspec.range
+            return f"string_{min_len}_{max_len}"
+        return "string"
+    if field_type in ("int", "float"):
+        if fspec.range:
+            min_val, max_val = fspec.range
+            return f"number_{min_val}_{max_val}"
+        return "number"
+    if field_type == "bool":
+        return "boolean"
+    if field_type.startswith("list["):
+        return "array"
+    return "value"
 
 def emit_peg_grammar(onto: Ontology, outdir: str) -> None:
     """
@@ -29,73 +60,48 @@ def emit_peg_grammar(onto: Ontology, outdir: str) -> None:
         "# Entity-specific rules",
     ]
     
+    # Length/range helper rules are collected in the same pass over the fields,
+    # keyed by rule name so each shared range is defined once (in first-seen order)
+    string_ranges: Dict[str, tuple] = {}
+    number_ranges: Dict[str, tuple] = {}
+    
     # Add entity-specific rules
     for ent_name, ent in onto.entities.items():
-        lines.append(f"# {ent_name} entity")
-        lines.append(f"{ent_name.lower()}_object <- '{{'")
+        lc = ent_name.lower()
         
         # Build required field pairs
         required_fields = [fname for fname, fspec in ent.fields.items() if fspec.required]
         optional_fields = [fname for fname, fspec in ent.fields.items() if not fspec.required]
         
+        lines.extend([f"# {ent_name} entity", f"{lc}_object <- '{{'"])
         if required_fields:
-            lines.append(f"  {ent_name.lower()}_required_fields")
-        
+            lines.append(f"  {lc}_required_fields")
         if optional_fields:
-            lines.append(f"  (',' {ent_name.lower()}_optional_fields)*")
-        
-        lines.append(f"  '}}'")
-        lines.append("")
+            lines.append(f"  (',' {lc}_optional_fields)*")
+        lines.extend(["  '}'", ""])
         
         # Required fields rule
         if required_fields:
-            lines.append(f"{ent_name.lower()}_required_fields <- {ent_name.lower()}_{required_fields[0]}_pair")
-            for field in required_fields[1:]:
-                lines.append(f"  (',' {ent_name.lower()}_{field}_pair)*")
+            lines.append(f"{lc}_required_fields <- {lc}_{required_fields[0]}_pair")
+            lines.extend([f"  (',' {lc}_{field}_pair)*" for field in required_fields[1:]])
             lines.append("")
         
         # Optional fields rule
         if optional_fields:
-            lines.append(f"{ent_name.lower()}_optional_fields <- {ent_name.lower()}_{optional_fields[0]}_pair")
-            for field in optional_fields[1:]:
-                lines.append(f"  / {ent_name.lower()}_{field}_pair")
+            lines.append(f"{lc}_optional_fields <- {lc}_{optional_fields[0]}_pair")
+            lines.extend([f"  / {lc}_{field}_pair" for field in optional_fields[1:]])
             lines.append("")
         
         # Field-specific rules
         for fname, fspec in ent.fields.items():
-            lines.append(f"# {fname} field")
-            lines.append(f"{ent_name.lower()}_{fname}_pair <- '\"{fname}\"' ':' {ent_name.lower()}_{fname}_value")
-            
-            # Value validation based on field type
-            if fspec.enum:
-                enum_values = " / ".join(f"'{val}'" for val in fspec.enum)
-                lines.append(f"{ent_name.lower()}_{fname}_value <- {enum_values}")
-            elif fspec.type == "string":
-                if fspec.range:
-                    min_len, max_len = fspec.range
-                    lines.append(f"{ent_name.lower()}_{fname}_value <- string_{min_len}_{max_len}")
-                else:
-                    lines.append(f"{ent_name.lower()}_{fname}_value <- string")
-            elif fspec.type == "int":
-                if fspec.range:
-                    min_val, max_val = fspec.range
-                    lines.append(f"{ent_name.lower()}_{fname}_value <- number_{min_val}_{max_val}")
-                else:
-                    lines.append(f"{ent_name.lower()}_{fname}_value <- number")
-            elif fspec.type == "float":
-                if fspec.range:
-                    min_val, max_val = fspec.range
-                    lines.append(f"{ent_name.lower()}_{fname}_value <- number_{min_val}_{max_val}")
-                else:
-                    lines.append(f"{ent_name.lower()}_{fname}_value <- number")
-            elif fspec.type == "bool":
-                lines.append(f"{ent_name.lower()}_{fname}_value <- boolean")
-            elif fspec.type.startswith("list["):
-                lines.append(f"{ent_name.lower()}_{fname}_value <- array")
-            else:
-                lines.append(f"{ent_name.lower()}_{fname}_value <- value")
+            lines.append(_FIELD_RULES.format_map({"f": fname, "lc": lc, "rule": _value_rule(fspec)}))
             
-            lines.append("")
+            if fspec.range:
+                min_val, max_val = fspec.range
+                if fspec.type == "string":
+                    string_ranges.setdefault(f"{min_val}_{max_val}", (min_val, max_val))
+                elif fspec.type in ("int", "float"):
+                    number_ranges.setdefault(f"{min_val}_{max_val}", (min_val, max_val))
     
     # Add constraint-based rules
     if onto.constraints:
@@ -108,59 +114,65 @@ def emit_peg_grammar(onto: Ontology, outdir: str) -> None:
     
     # Add length-constrained string rules
     lines.append("# Length-constrained strings")
-    for ent_name, ent in onto.entities.items():
-        for fname, fspec in ent.fields.items():
-            if fspec.type == "string" and fspec.range:
-                min_len, max_len = fspec.range
-                lines.append(f"string_{min_len}_{max_len} <- '\"' string_content_{min_len}_{max_len} '\"'")
-                lines.append(f"string_content_{min_len}_{max_len} <- (!'\"' .){{{min_len},{max_len}}}")
+    for suffix, (min_len, max_len) in string_ranges.items():
+        lines.append(f"string_{suffix} <- '\"' string_content_{suffix} '\"'")
+        lines.append(f"string_content_{suffix} <- (!'\"' .){{{min_len},{max_len}}}")
     
     # Add range-constrained number rules
     lines.append("# Range-constrained numbers")
-    for ent_name, ent in onto.entities.items():
-        for fname, fspec in ent.fields.items():
-            if fspec.type in ["int", "float"] and fspec.range:
-                min_val, max_val = fspec.range
-                lines.append(f"number_{min_val}_{max_val} <- number")
-                lines.append(f"# TODO: Add range validation for {min_val} <= number <= {max_val}")
+    for min_val, max_val in number_ranges.values():
+        lines.append(f"number_{min_val}_{max_val} <- number")
+        lines.append(f"# TODO: Add range validation for {min_val} <= number <= {max_val}")
     
     # Write the grammar file
     grammar_file = out_path / f"{onto.name}.peg"
-    with open(grammar_file, "w") as f:
-        f.write("\n".join(lines))
+    write_bytes(grammar_file, "\n".join(lines).encode("utf-8"))
     
     # Also create a JSON Schema-based grammar (simpler alternative)
     lines_json = [
         f"# JSON Schema-based grammar for {onto.name}",
         f"# This is a simpler approach using JSON Schema validation",
         "",
+        "import functools",
         "import json",
         "import jsonschema",
         "from pathlib import Path",
         "",
-        f"# Load the schema",
+        f"# The schema is loaded on first use, not at import time",
         f"SCHEMA_PATH = Path('{onto.name}.schema.json')",
-        "with open(SCHEMA_PATH) as f:",
-        "    SCHEMA = json.load(f)",
+        "",
+        "@functools.cache",
+        "def load_schema() -> dict:",
+        '    """Load and cache the schema."""',
+        "    with open(SCHEMA_PATH, 'rb') as f:",
+        "        return json.loads(f.read())",
+        "",
+        "@functools.cache",
+        "def _validator():",
+        '    """Check and build the validator once; jsonschema.validate() would redo both per call."""',
+        "    schema = load_schema()",
+        "    validator_cls = jsonschema.validators.validator_for(schema)",
+        "    validator_cls.check_schema(schema)",
+        "    return validator_cls(schema)",
+        "",
+        "def __getattr__(name):",
+        "    # Keep `SCHEMA` importable without loading it eagerly",
+        "    if name == 'SCHEMA':",
+        "        return load_schema()",
+        "    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')",
         "",
         "def validate_json(data_str: str) -> bool:",
         '    """Validate JSON string against the schema."""',
         "    try:",
         "        data = json.loads(data_str)",
-        "        jsonschema.validate(data, SCHEMA)",
-        "        return True",
-        "    except (json.JSONDecodeError, jsonschema.ValidationError):",
+        "    except json.JSONDecodeError:",
         "        return False",
+        "    return _validator().is_valid(data)",
         "",
         "def validate_object(data: dict) -> bool:",
         '    """Validate Python dict against the schema."""',
-        "    try:",
-        "        jsonschema.validate(data, SCHEMA)",
-        "        return True",
-        "    except jsonschema.ValidationError:",
-        "        return False",
+        "    return _validator().is_valid(data)",
     ]
     
     json_grammar_file = out_path / f"{onto.name}_validator.py"
-    with open(json_grammar_file, "w") as f:
-        f.write("\n".join(lines_json)) 
\ No newline at end of file
+    write_bytes(json_grammar_file, "\n".join(lines_json).encode("utf-8")) 
\ No newline at end of file
@@ -1,8 +1,9 @@
-import json
+import orjson
 from pathlib import Path
 from typing import Dict, Any
 from stc.ontology.models import Ontology
 from stc.config import ensure_dir
+from stc.utils.io import write_bytes
 
 TYPE_MAP = {
     "string": "string",
@@ -16,28 +17,25 @@ TYPE_MAP = {
     # Extend as needed...
 }
 
-def field_to_schema(field) -> Dict[str, Any]:
-    """Convert a field specification to JSON Schema."""
-    schema = {}
-    
-    # Handle enum fields
-    if field.enum:
-        schema["type"] = "string"
-        schema["enum"] = field.enum
-        return schema
-    
-    # Handle basic types
+def _enum_schema(field) -> Dict[str, Any]:
+    """Enum fields are string enums; descriptions are not emitted for them."""
+    return {"type": "string", "enum": field.enum}
+
+def _plain_schema(field) -> Dict[str, Any]:
+    """Base type mapping plus description."""
     base_type = TYPE_MAP.get(field.type, "string")
-    if isinstance(base_type, dict):
-        schema.update(base_type)
-    else:
-        schema["type"] = base_type
+    schema = dict(base_type) if isinstance(base_type, dict) else {"type": base_type}
+    
+    # Add description if available
+    if field.description:
+        schema["description"] = field.description
     
-    # Add range constraints for numbers
-    if field.range and field.type in ["int", "float"]:
-        min_val, max_val = field.range
-        schema["minimum"] = min_val
-        schema["maximum"] = max_val
+    return schema
+
+def _ranged_number_schema(field) -> Dict[str, Any]:
+    """Numeric type with minimum/maximum bounds plus description."""
+    min_val, max_val = field.range
+    schema = {"type": TYPE_MAP[field.type], "minimum": min_val, "maximum": max_val}
     
     # Add description if available
     if field.description:
@@ -45,33 +43,51 @@ def field_to_schema(field) -> Dict[str, Any]:
     
     return schema
 
+def _default_schema(field) -> Dict[str, Any]:
+    """Fallback for (type, has_range, has_enum) keys not in the dispatch table."""
+    return _enum_schema(field) if field.enum else _plain_schema(field)
+
+# Handlers keyed by (type, has_range, has_enum); enum wins over everything else
+_SCHEMA_DISPATCH = {
+    **{(ftype, False, False): _plain_schema for ftype in TYPE_MAP},
+    **{(ftype, True, False): _plain_schema for ftype in TYPE_MAP},
+    **{(ftype, ranged, True): _enum_schema for ftype in TYPE_MAP for ranged in (False, True)},
+    ("int", True, False): _ranged_number_schema,
+    ("float", True, False): _ranged_number_schema,
+}
+
+def field_to_schema(field) -> Dict[str, Any]:
+    """Convert a field specification to JSON Schema."""
+    handler = _SCHEMA_DISPATCH.get((field.type, bool(field.range), bool(field.enum)), _default_schema)
+    return handler(field)
+
+def _entity_definition(ent) -> Dict[str, Any]:
+    """Build the JSON Schema definition for one entity."""
+    fields = ent.fields
+    definition = {
+        "type": "object",
+        "properties": {fname: field_to_schema(fspec) for fname, fspec in fields.items()},
+        "additionalProperties": False
+    }
+    
+    required = [fname for fname, fspec in fields.items() if fspec.required]
+    if required:
+        definition["required"] = required
+    
+    if ent.description:
+        definition["description"] = ent.description
+    
+    return definition
+
 def emit_jsonschema(onto: Ontology, outdir: str) -> None:
     """Emit JSON Schema from ontology."""
     out_path = Path(outdir)
     ensure_dir(out_path)
     
     # Build definitions for each entity
-    definitions = {}
-    for ent_name, ent in onto.entities.items():
-        properties = {}
-        required = []
-        
-        for fname, fspec in ent.fields.items():
-            properties[fname] = field_to_schema(fspec)
-            if fspec.required:
-                required.append(fname)
-        
-        definitions[ent_name] = {
-            "type": "object",
-            "properties": properties,
-            "additionalProperties": False
-        }
-        
-        if required:
-            definitions[ent_name]["required"] = required
-        
-        if ent.description:
-            definitions[ent_name]["description"] = ent.description
+    definitions = {ent_name: _entity_definition(ent) for ent_name, ent in onto.entities.items()}
+    entity_names = list(onto.entities.keys())
+    entity_refs = [{"$ref": f"#/definitions/{ent_name}"} for ent_name in entity_names]
     
     # Build the full schema
     schema = {
@@ -80,10 +96,7 @@ def emit_jsonschema(onto: Ontology, outdir: str) -> None:
         "title": onto.name.title(),
         "description": onto.description or f"Schema for {onto.name}",
         "definitions": definitions,
-        "oneOf": [
-            {"$ref": f"#/definitions/{ent_name}"} 
-            for ent_name in onto.entities.keys()
-        ]
+        "oneOf": entity_refs
     }
     
     # Add version if specified
@@ -92,8 +105,7 @@ def emit_jsonschema(onto: Ontology, outdir: str) -> None:
     
     # Write the schema file
     schema_file = out_path / f"{onto.name}.schema.json"
-    with open(schema_file, "w") as f:
-        json.dump(schema, f, indent=2)
+    write_bytes(schema_file, orjson.dumps(schema, option=orjson.OPT_INDENT_2))
     
     # Also create a root schema that references all entities
     root_schema = {
@@ -106,19 +118,15 @@ def emit_jsonschema(onto: Ontology, outdir: str) -> None:
         "properties": {
             "type": {
                 "type": "string",
-                "enum": list(onto.entities.keys()),
+                "enum": entity_names,
                 "description": "The type of entity"
             },
             "data": {
-                "oneOf": [
-                    {"$ref": f"#/definitions/{ent_name}"} 
-                    for ent_name in onto.entities.keys()
-                ]
+                "oneOf": entity_refs
             }
         },
         "required": ["type", "data"]
     }
     
     root_file = out_path / f"{onto.name}-root.schema.json"
-    with open(root_file, "w") as f:
-        json.dump(root_schema, f, indent=2) 
\ No newline at end of file
+    write_bytes(root_file, orjson.dumps(root_schema, option=orjson.OPT_INDENT_2)) 
\ No newline at end of file
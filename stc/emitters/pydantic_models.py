@@ -1,7 +1,8 @@
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 from stc.ontology.models import Ontology
 from stc.config import ensure_dir
+from stc.utils.io import write_bytes
 
 TYPE_MAP = {
     "string": "str",
@@ -14,108 +15,161 @@ TYPE_MAP = {
     "list[bool]": "List[bool]",
 }
 
+# Whole-file layout for the generated models module; sections end in their own newlines
+_MODELS_TEMPLATE = '''"""Auto-generated Pydantic models from ontology."""
+
+from pydantic import BaseModel, Field, TypeAdapter
+from typing import List, Literal, Optional, Union
+from datetime import datetime
+
+
+{custom_imports}{classes}{root_model}# Batch validators (build the list schema once, not per call)
+{adapters}
+{batch_validators}# Example usage:
+# from .models import {names}
+#
+# # Create an instance
+# instance = {first}(...)
+#
+# # Validate data
+# validated = {first}.model_validate(data_dict)
+#
+# # Validate many records at once
+# validated = validate_{first_lc}_batch(list_of_dicts)'''
+
+_ROOT_MODEL_TEMPLATE = '''class RootModel(BaseModel):
+    """Root model that can represent any entity type."""
+    type: str = Field(description='The type of entity')
+    data: Union[{union}] = Field(description='The entity data')
+
+'''
+
+def _enum_annotation(field) -> Tuple[str, List[str]]:
+    """Enums become Literal types so pydantic-core enforces them."""
+    return f"Literal[{', '.join(repr(val) for val in field.enum)}]", []
+
+def _plain_annotation(field) -> Tuple[str, List[str]]:
+    """Mapped base type with no bound constraints."""
+    return TYPE_MAP.get(field.type, "str"), []
+
+def _ranged_number_annotation(field) -> Tuple[str, List[str]]:
+    """Numeric type with ge/le bounds."""
+    min_val, max_val = field.range
+    return TYPE_MAP[field.type], [f"ge={min_val}", f"le={max_val}"]
+
+def _default_annotation(field) -> Tuple[str, List[str]]:
+    """Fallback for (type, has_range, has_enum) keys not in the dispatch table."""
+    return _enum_annotation(field) if field.enum else _plain_annotation(field)
+
+# Handlers keyed by (type, has_range, has_enum), mirroring the JSON Schema emitter:
+# enum wins over everything else (its values are strings, so ge/le could never apply),
+# and only ranged numeric fields get ge/le, so pydantic-core adds no needless bound checks.
+_ANNOTATION_DISPATCH = {
+    **{(ftype, False, False): _plain_annotation for ftype in TYPE_MAP},
+    **{(ftype, True, False): _plain_annotation for ftype in TYPE_MAP},
+    **{(ftype, ranged, True): _enum_annotation for ftype in TYPE_MAP for ranged in (False, True)},
+    ("int", True, False): _ranged_number_annotation,
+    ("float", True, False): _ranged_number_annotation,
+}
+
 def field_to_pydantic(field) -> str:
     """Convert a field specification to Pydantic field definition."""
-    field_type = TYPE_MAP.get(field.type, "str")
-    
-    # Build field definition
-    parts = [field_type]
-    
-    # Add default if specified
-    if field.default is not None:
-        parts.append(f"default={repr(field.default)}")
+    handler = _ANNOTATION_DISPATCH.get((field.type, bool(field.range), bool(field.enum)), _default_annotation)
+    field_type, bound_args = handler(field)
     
     # Add Field() with constraints
     field_args = []
     
     if field.description:
-        field_args.append(f'description="{field.description}"')
-    
-    if field.enum:
-        field_args.append(f'enum={field.enum}')
+        field_args.append(f"description={field.description!r}")
     
-    if field.range and field.type in ["int", "float"]:
-        min_val, max_val = field.range
-        field_args.append(f"ge={min_val}")
-        field_args.append(f"le={max_val}")
+    field_args.extend(bound_args)
     
-    if not field.required:
+    # Add default if specified
+    if field.default is not None:
+        field_args.append(f"default={field.default!r}")
+    elif not field.required:
+        field_type = f"Optional[{field_type}]"
         field_args.append("default=None")
     
     if field_args:
-        parts.append(f"Field({', '.join(field_args)})")
+        return f"{field_type} = Field({', '.join(field_args)})"
     
-    return ": ".join(parts)
+    return field_type
+
+def _render_class(ent_name: str, ent) -> str:
+    """Render one entity's model class, including the blank line after it."""
+    lines = [f"class {ent_name}(BaseModel):"]
+    
+    # Add class docstring
+    if ent.description:
+        lines.append(f'    """{ent.description}"""')
+    
+    # Add fields
+    lines.extend([f"    {fname}: {field_to_pydantic(fspec)}" for fname, fspec in ent.fields.items()])
+    return "\n".join(lines) + "\n\n"
+
+def _render_batch_validator(name: str, model: str, adapter: str) -> str:
+    """Render a validate_<name>_batch function over a cached list adapter."""
+    return (
+        f"def validate_{name}_batch(items: List[dict]) -> List[{model}]:\n"
+        f'    """Validate a list of dicts as {model} instances in one pass."""\n'
+        f"    return {adapter}.validate_python(items)\n"
+        "\n"
+    )
 
 def emit_pydantic_models(onto: Ontology, outdir: str) -> None:
     """Emit Pydantic models from ontology."""
     out_path = Path(outdir)
     ensure_dir(out_path)
     
-    # Generate the Python file content
-    lines = [
-        '"""Auto-generated Pydantic models from ontology."""',
-        "",
-        "from pydantic import BaseModel, Field",
-        "from typing import List, Optional, Union",
-        "from datetime import datetime",
-        "",
-        "",
-    ]
+    entity_names = list(onto.entities.keys())
+    has_root = len(entity_names) > 1
     
     # Add imports for any custom types
-    custom_types = set()
-    for entity in onto.entities.values():
-        for field in entity.fields.values():
-            if field.type not in TYPE_MAP:
-                custom_types.add(field.type)
-    
+    custom_types = {
+        field.type
+        for entity in onto.entities.values()
+        for field in entity.fields.values()
+        if field.type not in TYPE_MAP
+    }
+    
+    custom_imports = ""
     if custom_types:
-        lines.append("# Custom type imports")
-        for custom_type in sorted(custom_types):
-            lines.append(f"# from .{custom_type.lower()} import {custom_type}")
-        lines.append("")
+        custom_imports = "# Custom type imports\n" + "".join(
+            f"# from .{custom_type.lower()} import {custom_type}\n" for custom_type in sorted(custom_types)
+        ) + "\n"
     
     # Generate each entity as a Pydantic model
-    for ent_name, ent in onto.entities.items():
-        # Add class docstring
-        if ent.description:
-            lines.append(f'class {ent_name}(BaseModel):')
-            lines.append(f'    """{ent.description}"""')
-        else:
-            lines.append(f'class {ent_name}(BaseModel):')
-        
-        # Add fields
-        for fname, fspec in ent.fields.items():
-            field_def = field_to_pydantic(fspec)
-            lines.append(f"    {fname}: {field_def}")
-        
-        lines.append("")
+    classes = "".join(_render_class(ent_name, ent) for ent_name, ent in onto.entities.items())
     
     # Add a root model that can represent any entity
-    if len(onto.entities) > 1:
-        lines.append("class RootModel(BaseModel):")
-        lines.append('    """Root model that can represent any entity type."""')
-        lines.append("    type: str = Field(description='The type of entity')")
-        lines.append("    data: Union[" + ", ".join(onto.entities.keys()) + "] = Field(description='The entity data')")
-        lines.append("")
-    
-    # Add example usage
-    lines.extend([
-        "# Example usage:",
-        "# from .models import " + ", ".join(onto.entities.keys()),
-        "#",
-        "# # Create an instance",
-        "# instance = " + list(onto.entities.keys())[0] + "(...)",
-        "#",
-        "# # Validate data",
-        "# validated = " + list(onto.entities.keys())[0] + ".model_validate(data_dict)",
-    ])
+    root_model = ""
+    if has_root:
+        root_model = _ROOT_MODEL_TEMPLATE.format(union=", ".join(entity_names))
+    
+    # Add cached list adapters so batches validate in one pydantic-core call
+    adapters = "".join(f"{ent_name.upper()}_LIST_ADAPTER = TypeAdapter(List[{ent_name}])\n" for ent_name in entity_names)
+    batch_validators = "".join(
+        _render_batch_validator(ent_name.lower(), ent_name, f"{ent_name.upper()}_LIST_ADAPTER")
+        for ent_name in entity_names
+    )
+    if has_root:
+        adapters += "ROOT_LIST_ADAPTER = TypeAdapter(List[RootModel])\n"
+        batch_validators += _render_batch_validator("root", "RootModel", "ROOT_LIST_ADAPTER")
     
     # Write the file
     models_file = out_path / f"{onto.name}_models.py"
-    with open(models_file, "w") as f:
-        f.write("\n".join(lines))
+    write_bytes(models_file, _MODELS_TEMPLATE.format(
+        custom_imports=custom_imports,
+        classes=classes,
+        root_model=root_model,
+        adapters=adapters,
+        batch_validators=batch_validators,
+        names=", ".join(entity_names),
+        first=entity_names[0],
+        first_lc=entity_names[0].lower(),
+    ).encode("utf-8"))
     
     # Also create an __init__.py for easy importing
     init_lines = [
@@ -123,17 +177,21 @@ def emit_pydantic_models(onto: Ontology, outdir: str) -> None:
         "",
     ]
     
-    for ent_name in onto.entities.keys():
+    for ent_name in entity_names:
         init_lines.append(f"from .{onto.name}_models import {ent_name}")
     
-    if len(onto.entities) > 1:
+    if has_root:
         init_lines.append(f"from .{onto.name}_models import RootModel")
     
+    batch_names = [f"validate_{ent_name.lower()}_batch" for ent_name in entity_names]
+    if has_root:
+        batch_names.append("validate_root_batch")
+    init_lines.append(f"from .{onto.name}_models import {', '.join(batch_names)}")
+    
     init_lines.extend([
         "",
-        "__all__ = [" + ", ".join(f'"{name}"' for name in onto.entities.keys()) + "]",
+        "__all__ = [" + ", ".join(f'"{name}"' for name in [*entity_names, *batch_names]) + "]",
     ])
     
     init_file = out_path / "__init__.py"
-    with open(init_file, "w") as f:
-        f.write("\n".join(init_lines)) 
\ No newline at end of file
+    write_bytes(init_file, "\n".join(init_lines).encode("utf-8")) 
\ No newline at end of file
@@ -1,7 +1,8 @@
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 from stc.ontology.models import Ontology
 from stc.config import ensure_dir
+from stc.utils.io import write_segments
 
 TYPE_MAP = {
     "string": "string",
@@ -24,117 +25,122 @@ def field_to_typescript(field) -> str:
     
     return field_type
 
-def emit_ts_interfaces(onto: Ontology, outdir: str) -> None:
-    """Emit TypeScript interfaces from ontology."""
-    out_path = Path(outdir)
-    ensure_dir(out_path)
-    
-    # Generate the TypeScript file content
-    lines = [
-        '// Auto-generated TypeScript interfaces from ontology',
-        "",
-        f"// {onto.name} - {onto.description or 'Generated interfaces'}",
-        "",
+# Layout of the generated interfaces module around the per-entity interfaces
+# and root types; sections end in their own newlines
+_INTERFACES_HEADER = """// Auto-generated TypeScript interfaces from ontology
+
+// {name} - {description}
+
+{version}"""
+
+_INTERFACES_FOOTER = """// Utility types
+export type {title}EntityTypes = keyof typeof {title}Entities;
+
+export const {title}Entities = {{
+{entity_consts}}} as const;
+
+// Type guards
+{type_guards}// Example usage:
+// import {{ {names} }} from './{name}_interfaces';
+//
+// const data: {first} = {{
+//   // ... field values
+// }};"""
+
+_ROOT_TYPES_TEMPLATE = """export type {title}Entity = {union};
+
+/** Root interface that can represent any entity type */
+export interface {title}Root {{
+  type: {title}Entity;
+  data: {title}Entity;
+}}
+
+"""
+
+_TYPE_GUARD_TEMPLATE = """export function is{ent}(obj: any): obj is {ent} {{
+  return obj && typeof obj === 'object' && 'type' in obj && obj.type === '{ent}';
+}}
+
+"""
+
+def _prepare_fields(ent) -> List[Tuple[str, str, Optional[str]]]:
+    """One pass over an entity's fields: (name, TypeScript type, description)."""
+    type_get = TYPE_MAP.get
+    return [
+        (fname, type_get(fspec.type, "string") + ("" if fspec.required else "?"), fspec.description)
+        for fname, fspec in ent.fields.items()
     ]
+
+def _render_interface(ent_name: str, ent) -> str:
+    """Render one entity's interface, including the blank line after it."""
+    lines = []
     
-    # Add version comment if specified
-    if onto.version:
-        lines.append(f"// Version: {onto.version}")
-        lines.append("")
-    
-    # Generate each entity as a TypeScript interface
-    for ent_name, ent in onto.entities.items():
-        # Add interface comment
-        if ent.description:
-            lines.append(f"/** {ent.description} */")
-        
-        lines.append(f"export interface {ent_name} {{")
-        
-        # Add fields
-        for fname, fspec in ent.fields.items():
-            field_type = field_to_typescript(fspec)
-            
-            # Add field comment if description exists
-            if fspec.description:
-                lines.append(f"  /** {fspec.description} */")
-            
-            lines.append(f"  {fname}: {field_type};")
-        
-        lines.append("}")
-        lines.append("")
-    
-    # Add a union type for all entities
-    if len(onto.entities) > 1:
-        entity_names = list(onto.entities.keys())
-        lines.append(f"export type {onto.name.title()}Entity = " + " | ".join(entity_names) + ";")
-        lines.append("")
-    
-    # Add a root interface that can represent any entity
-    if len(onto.entities) > 1:
-        lines.append("/** Root interface that can represent any entity type */")
-        lines.append(f"export interface {onto.name.title()}Root {{")
-        lines.append(f"  type: {onto.name.title()}Entity;")
-        lines.append(f"  data: {onto.name.title()}Entity;")
-        lines.append("}")
-        lines.append("")
-    
-    # Add utility types
-    lines.extend([
-        "// Utility types",
-        f"export type {onto.name.title()}EntityTypes = keyof typeof {onto.name.title()}Entities;",
-        "",
-        f"export const {onto.name.title()}Entities = {{",
-    ])
+    # Add interface comment
+    if ent.description:
+        lines.append(f"/** {ent.description} */")
     
-    for ent_name in onto.entities.keys():
-        lines.append(f"  {ent_name}: '{ent_name}',")
+    lines.append(f"export interface {ent_name} {{")
     
-    lines.extend([
-        "} as const;",
-        "",
-        "// Type guards",
-    ])
+    # Add fields
+    for fname, ts_type, description in _prepare_fields(ent):
+        # Add field comment if description exists
+        if description:
+            lines.append(f"  /** {description} */")
+        
+        lines.append(f"  {fname}: {ts_type};")
     
-    for ent_name in onto.entities.keys():
-        lines.append(f"export function is{ent_name}(obj: any): obj is {ent_name} {{")
-        lines.append(f"  return obj && typeof obj === 'object' && 'type' in obj && obj.type === '{ent_name}';")
-        lines.append("}")
-        lines.append("")
+    lines.append("}")
+    return "\n".join(lines) + "\n\n"
+
+def emit_ts_interfaces(onto: Ontology, outdir: str) -> None:
+    """Emit TypeScript interfaces from ontology."""
+    out_path = Path(outdir)
+    ensure_dir(out_path)
     
-    # Add example usage
-    lines.extend([
-        "// Example usage:",
-        f"// import {{ {', '.join(onto.entities.keys())} }} from './{onto.name}_interfaces';",
-        "//",
-        "// const data: " + list(onto.entities.keys())[0] + " = {",
-        "//   // ... field values",
-        "// };",
-    ])
+    entity_names = list(onto.entities.keys())
+    title = onto.name.title()
+    
+    # Add a union type and root interface when there is more than one entity
+    root_types = ""
+    if len(entity_names) > 1:
+        root_types = _ROOT_TYPES_TEMPLATE.format(title=title, union=" | ".join(entity_names))
+    
+    # Each section is encoded on its own and handed to writev as one segment
+    segments = [_INTERFACES_HEADER.format(
+        name=onto.name,
+        description=onto.description or 'Generated interfaces',
+        version=f"// Version: {onto.version}\n\n" if onto.version else "",
+    ).encode("utf-8")]
+    segments.extend(_render_interface(ent_name, ent).encode("utf-8") for ent_name, ent in onto.entities.items())
+    segments.append(root_types.encode("utf-8"))
+    segments.append(_INTERFACES_FOOTER.format(
+        name=onto.name,
+        title=title,
+        entity_consts="".join(f"  {ent_name}: '{ent_name}',\n" for ent_name in entity_names),
+        type_guards="".join(_TYPE_GUARD_TEMPLATE.format(ent=ent_name) for ent_name in entity_names),
+        names=", ".join(entity_names),
+        first=entity_names[0],
+    ).encode("utf-8"))
     
     # Write the file
     interfaces_file = out_path / f"{onto.name}_interfaces.ts"
-    with open(interfaces_file, "w") as f:
-        f.write("\n".join(lines))
+    write_segments(interfaces_file, segments)
     
-    # Also create an index.ts for easy importing
-    index_lines = [
-        f'// Export all interfaces for {onto.name}',
-        "",
-    ]
+    # Also create an index.ts for easy importing; every export line is its own
+    # segment, prefixed with the newline that ends the line before it
+    source = f"from './{onto.name}_interfaces';"
+    index_segments = [f"// Export all interfaces for {onto.name}\n".encode("utf-8")]
     
-    for ent_name in onto.entities.keys():
-        index_lines.append(f"export {{ {ent_name} }} from './{onto.name}_interfaces';")
+    index_segments.extend(f"\nexport {{ {ent_name} }} {source}".encode("utf-8") for ent_name in entity_names)
     
-    if len(onto.entities) > 1:
-        index_lines.extend([
-            f"export {{ {onto.name.title()}Entity, {onto.name.title()}Root }} from './{onto.name}_interfaces';",
-            f"export {{ {onto.name.title()}EntityTypes, {onto.name.title()}Entities }} from './{onto.name}_interfaces';",
+    if len(entity_names) > 1:
+        index_segments.extend([
+            f"\nexport {{ {title}Entity, {title}Root }} {source}".encode("utf-8"),
+            f"\nexport {{ {title}EntityTypes, {title}Entities }} {source}".encode("utf-8"),
         ])
     
     # Add type guards
-    for ent_name in onto.entities.keys():
-        index_lines.append(f"export {{ is{ent_name} }} from './{onto.name}_interfaces';")
+    index_segments.extend(f"\nexport {{ is{ent_name} }} {source}".encode("utf-8") for ent_name in entity_names)
     
     index_file = out_path / "index.ts"
-    with open(index_file, "w") as f:
-        f.write("\n".join(index_lines)) 
\ No newline at end of file
+    write_segments(index_file, index_segments)
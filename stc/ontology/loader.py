@@ -1,49 +1,223 @@
-from ruamel.yaml import YAML
+import os
+import re
+import sys
+import orjson
+import yaml
+from functools import lru_cache
 from pathlib import Path
-import json
-from typing import Union
-from .models import Ontology, FieldSpec, EntitySpec, Constraint, ExamplePair
+from typing import Any, Union
+from .models import Constraint, EntitySpec, ExamplePair, FieldSpec, Ontology
 
-yaml = YAML(typ="safe")
+# libyaml's C parser when PyYAML was built with it; pure-Python otherwise
+try:
+    from yaml import CSafeLoader as _BaseLoader
+except ImportError:
+    from yaml import SafeLoader as _BaseLoader
+
+class _OntologyLoader(_BaseLoader):
+    """Safe loader resolving plain scalars per the YAML 1.2 core schema, as ruamel did."""
+    
+    def construct_mapping(self, node, deep=False):
+        """Reject duplicate keys instead of silently keeping the last one."""
+        if isinstance(node, yaml.MappingNode):
+            seen = set()
+            for key_node, _ in node.value:
+                if key_node.tag == "tag:yaml.org,2002:merge":
+                    # `<<` merges are allowed to override
+                    continue
+                # Memoized per node, so the real construction below reuses it
+                key = self.construct_object(key_node, deep=deep)
+                try:
+                    duplicate = key in seen
+                except TypeError:
+                    # Unhashable key; let the base constructor report it
+                    continue
+                if duplicate:
+                    raise yaml.constructor.ConstructorError(
+                        "while constructing a mapping", node.start_mark,
+                        f"found duplicate key {key!r}", key_node.start_mark,
+                    )
+                seen.add(key)
+        return super().construct_mapping(node, deep=deep)
+
+# PyYAML resolves YAML 1.1 scalars (yes/no booleans, sexagesimal ints, no 1e3 floats);
+# swap those resolvers for the 1.2 core ones so ontologies mean what they meant before
+_YAML11_TAGS = {"tag:yaml.org,2002:bool", "tag:yaml.org,2002:int", "tag:yaml.org,2002:float"}
+_OntologyLoader.yaml_implicit_resolvers = {
+    first: [(tag, regexp) for tag, regexp in resolvers if tag not in _YAML11_TAGS]
+    for first, resolvers in _BaseLoader.yaml_implicit_resolvers.items()
+}
+_OntologyLoader.add_implicit_resolver(
+    "tag:yaml.org,2002:bool",
+    re.compile(r"^(?:true|True|TRUE|false|False|FALSE)$"),
+    list("tTfF"),
+)
+_OntologyLoader.add_implicit_resolver(
+    "tag:yaml.org,2002:int",
+    re.compile(r"^[-+]?(?:[0-9][0-9_]*|0o[0-7_]+|0x[0-9a-fA-F_]+|0b[01_]+)$"),
+    list("-+0123456789"),
+)
+_OntologyLoader.add_implicit_resolver(
+    "tag:yaml.org,2002:float",
+    re.compile(r"""^(?:[-+]?(?:[0-9][0-9_]*\.[0-9_]*|\.[0-9_]+)(?:[eE][-+]?[0-9]+)?
+                    |[-+]?[0-9][0-9_]*[eE][-+]?[0-9]+
+                    |[-+]?\.(?:inf|Inf|INF)
+                    |\.(?:nan|NaN|NAN))$""", re.X),
+    list("-+0123456789."),
+)
+
+def _construct_yaml12_int(loader, node) -> int:
+    """Leading zeros are decimal in YAML 1.2 (PyYAML would read 010 as octal 8)."""
+    value = loader.construct_scalar(node).replace("_", "")
+    sign = -1 if value[0] == "-" else 1
+    value = value.lstrip("+-")
+    base = {"0o": 8, "0x": 16, "0b": 2}.get(value[:2], 10)
+    return sign * int(value[2:] if base != 10 else value, base)
+
+_OntologyLoader.add_constructor("tag:yaml.org,2002:int", _construct_yaml12_int)
 
 def load_ontology(path: Union[str, Path]) -> Ontology:
-    """Load ontology from YAML or JSON file."""
+    """Load ontology from YAML or JSON file.
+    
+    Results are cached per file version (path, mtime, size), so repeated loads
+    return the same Ontology instance; treat it as read-only.
+    """
     path = Path(path)
     
-    if not path.exists():
-        raise FileNotFoundError(f"Ontology file not found: {path}")
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Ontology file not found: {path}") from None
+    
+    return _load_cached(os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+@lru_cache(maxsize=128)
+def _load_cached(resolved: str, mtime_ns: int, size: int) -> Ontology:
+    """Parse and build an Ontology; the stat fields only key the cache."""
+    path = Path(resolved)
     
     if path.suffix.lower() in ['.yaml', '.yml']:
-        data = yaml.load(path.read_text())
+        # libyaml reads and decodes straight from the binary stream, so the
+        # whole file is never materialized as a Python str
+        with path.open("rb", buffering=1 << 20) as f:
+            data = yaml.load(f, Loader=_OntologyLoader)
     elif path.suffix.lower() == '.json':
-        data = json.loads(path.read_text())
+        with path.open("rb") as f:
+            data = orjson.loads(f.read())
     else:
         raise ValueError(f"Unsupported file format: {path.suffix}")
     
     # Convert raw dict to Ontology object
-    entities = {}
-    for name, spec in data.get("entities", {}).items():
-        fields = {}
-        for fname, fdef in spec.get("fields", {}).items():
-            if isinstance(fdef, dict):
-                fields[fname] = FieldSpec(**fdef)
-            else:
-                # Handle simple string type definitions
-                fields[fname] = FieldSpec(type=str(fdef))
-        
-        entities[name] = EntitySpec(
-            fields=fields,
-            description=spec.get("description")
-        )
-    
-    constraints = [Constraint(**c) for c in data.get("constraints", [])]
-    examples = [ExamplePair(**e) for e in data.get("examples", [])]
-    
+    entities = {
+        _intern(name): _build_entity(name, spec)
+        for name, spec in _expect(data.get("entities", {}), dict, "entities").items()
+    }
     return Ontology(
-        name=data.get("name", path.stem),
+        name=_expect(data.get("name", path.stem), str, "name"),
         entities=entities,
-        constraints=constraints,
-        examples=examples,
-        description=data.get("description"),
-        version=data.get("version")
-    ) 
\ No newline at end of file
+        constraints=tuple(
+            _build_constraint(i, c)
+            for i, c in enumerate(_expect(data.get("constraints", []), list, "constraints"))
+        ),
+        examples=tuple(
+            _build_example(i, e)
+            for i, e in enumerate(_expect(data.get("examples", []), list, "examples"))
+        ),
+        description=_optional(data.get("description"), str, "description"),
+        version=_optional(data.get("version"), str, "version"),
+    )
+
+# Spellings pydantic's lax bool validation accepted for `required`
+_BOOL_STRINGS = {
+    "1": True, "on": True, "t": True, "true": True, "y": True, "yes": True,
+    "0": False, "off": False, "f": False, "false": False, "n": False, "no": False,
+}
+_SEVERITIES = ("error", "warning", "info")
+
+# Ontologies share a tiny vocabulary ("string", "int", enum values, field names);
+# interning costs one table probe per string at load, but keeps a single object per
+# spelling across loaded ontologies and lets TYPE_MAP/_TYPE_CHECKERS lookups hit on identity
+def _intern(value: Any) -> Any:
+    """sys.intern str values; anything else passes through."""
+    return sys.intern(value) if type(value) is str else value
+
+def _expect(value: Any, types, where: str) -> Any:
+    """Return value if it has one of the given types, else raise ValueError naming where."""
+    if not isinstance(value, types):
+        expected = types.__name__ if isinstance(types, type) else " or ".join(t.__name__ for t in types)
+        raise ValueError(f"{where}: expected {expected}, got {type(value).__name__}")
+    return value
+
+def _optional(value: Any, types, where: str) -> Any:
+    """Like _expect, but None passes through."""
+    return None if value is None else _expect(value, types, where)
+
+def _as_bool(value: Any, where: str) -> bool:
+    """Coerce a YAML/JSON flag, accepting the string and 0/1 spellings."""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str) and value.lower() in _BOOL_STRINGS:
+        return _BOOL_STRINGS[value.lower()]
+    raise ValueError(f"{where}: expected bool, got {value!r}")
+
+def _build_field(where: str, fdef: Any) -> FieldSpec:
+    """Validate one field definition; shorthand `name: type` strings are expanded."""
+    if not isinstance(fdef, dict):
+        # Handle simple string type definitions
+        return FieldSpec(type=_intern(str(fdef)))
+    
+    enum = _optional(fdef.get("enum"), (list, tuple), f"{where}.enum")
+    if enum is not None:
+        enum = tuple(_intern(_expect(v, str, f"{where}.enum[{i}]")) for i, v in enumerate(enum))
+    
+    rng = _optional(fdef.get("range"), (list, tuple), f"{where}.range")
+    if rng is not None:
+        if len(rng) != 2:
+            raise ValueError(f"{where}.range: expected [min, max], got {len(rng)} items")
+        rng = tuple(float(_expect(v, (int, float), f"{where}.range[{i}]")) for i, v in enumerate(rng))
+    
+    return FieldSpec(
+        type=_intern(_expect(fdef.get("type"), str, f"{where}.type")),
+        enum=enum,
+        range=rng,
+        description=_optional(fdef.get("description"), str, f"{where}.description"),
+        required=_as_bool(fdef.get("required", True), f"{where}.required"),
+        default=fdef.get("default"),
+    )
+
+def _build_entity(name: str, spec: Any) -> EntitySpec:
+    """Validate one entity and its fields."""
+    where = f"entities.{name}"
+    spec = _expect(spec, dict, where)
+    return EntitySpec(
+        fields={
+            _intern(fname): _build_field(f"{where}.fields.{fname}", fdef)
+            for fname, fdef in _expect(spec.get("fields", {}), dict, f"{where}.fields").items()
+        },
+        description=_optional(spec.get("description"), str, f"{where}.description"),
+    )
+
+def _build_constraint(i: int, raw: Any) -> Constraint:
+    """Validate one constraint entry."""
+    where = f"constraints[{i}]"
+    raw = _expect(raw, dict, where)
+    severity = raw.get("severity", "error")
+    if severity not in _SEVERITIES:
+        raise ValueError(f"{where}.severity: expected one of {_SEVERITIES}, got {severity!r}")
+    return Constraint(
+        expr=_expect(raw.get("expr"), str, f"{where}.expr"),
+        message=_optional(raw.get("message"), str, f"{where}.message"),
+        severity=severity,
+    )
+
+def _build_example(i: int, raw: Any) -> ExamplePair:
+    """Validate one input/output example."""
+    where = f"examples[{i}]"
+    raw = _expect(raw, dict, where)
+    return ExamplePair(
+        input=_expect(raw.get("input"), dict, f"{where}.input"),
+        output=_expect(raw.get("output"), dict, f"{where}.output"),
+        description=_optional(raw.get("description"), str, f"{where}.description"),
+    )
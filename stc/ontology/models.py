@@ -1,32 +1,65 @@
-from pydantic import BaseModel, Field
-from typing import Dict, List, Literal, Any, Optional, Union
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Literal, Any, NamedTuple, Optional, Tuple
 
-class FieldSpec(BaseModel):
+@dataclass(frozen=True, slots=True)
+class FieldSpec:
     type: str
-    enum: Optional[List[str]] = None
-    range: Optional[tuple[float, float]] = None
+    enum: Optional[Tuple[str, ...]] = None
+    range: Optional[Tuple[float, float]] = None
     description: Optional[str] = None
     required: bool = True
     default: Optional[Any] = None
+    # Enum values as a frozenset, for O(1) membership checks
+    enum_set: Optional[FrozenSet[str]] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "enum_set", frozenset(self.enum) if self.enum is not None else None)
 
-class EntitySpec(BaseModel):
+class CompiledField(NamedTuple):
+    """Flat view of a FieldSpec for per-row validation."""
+    type: str
+    enum: Optional[Tuple[str, ...]]
+    enum_set: Optional[FrozenSet[str]]
+    range: Optional[Tuple[float, float]]
+
+class CompiledEntity(NamedTuple):
+    """Flat view of an EntitySpec: required names plus per-field lookups."""
+    required: Tuple[str, ...]
+    fields: Dict[str, CompiledField]
+
+@dataclass(frozen=True, slots=True)
+class EntitySpec:
     fields: Dict[str, FieldSpec]
     description: Optional[str] = None
+    # Field specs flattened once, so validation skips attribute access per row
+    compiled: CompiledEntity = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "compiled", CompiledEntity(
+            required=tuple(name for name, spec in self.fields.items() if spec.required),
+            fields={
+                name: CompiledField(spec.type, spec.enum, spec.enum_set, spec.range)
+                for name, spec in self.fields.items()
+            },
+        ))
 
-class Constraint(BaseModel):
+@dataclass(frozen=True, slots=True)
+class Constraint:
     expr: str   # e.g. "len(summary) <= 300"
     message: Optional[str] = None
     severity: Literal["error", "warning", "info"] = "error"
 
-class ExamplePair(BaseModel):
+@dataclass(frozen=True, slots=True)
+class ExamplePair:
     input: Dict[str, Any]
     output: Dict[str, Any]
     description: Optional[str] = None
 
-class Ontology(BaseModel):
+@dataclass(frozen=True, slots=True)
+class Ontology:
     name: str
     entities: Dict[str, EntitySpec]
-    constraints: List[Constraint] = []
-    examples: List[ExamplePair] = []
+    constraints: Tuple[Constraint, ...] = ()
+    examples: Tuple[ExamplePair, ...] = ()
     description: Optional[str] = None
-    version: Optional[str] = None 
\ No newline at end of file
+    version: Optional[str] = None
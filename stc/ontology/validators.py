@@ -1,17 +1,14 @@
 """Validators for ontology data structures."""
 
-from typing import Dict, List, Any
-from .models import Ontology, EntitySpec, FieldSpec, Constraint
+import operator
+import re
+from typing import Any, Callable, Dict, List, Union
+from .models import Ontology, EntitySpec, FieldSpec, Constraint, CompiledField
 
 def validate_ontology(ontology: Ontology) -> List[str]:
     """Validate ontology and return list of errors."""
     errors = []
     
-    # Check for duplicate entity names
-    entity_names = list(ontology.entities.keys())
-    if len(entity_names) != len(set(entity_names)):
-        errors.append("Duplicate entity names found")
-    
     # Validate each entity
     for entity_name, entity in ontology.entities.items():
         entity_errors = validate_entity(entity_name, entity)
@@ -28,11 +25,6 @@ def validate_entity(name: str, entity: EntitySpec) -> List[str]:
     """Validate a single entity."""
     errors = []
     
-    # Check for duplicate field names
-    field_names = list(entity.fields.keys())
-    if len(field_names) != len(set(field_names)):
-        errors.append(f"Entity '{name}': Duplicate field names")
-    
     # Validate each field
     for field_name, field in entity.fields.items():
         field_errors = validate_field(field_name, field)
@@ -50,8 +42,8 @@ def validate_field(name: str, field: FieldSpec) -> List[str]:
     
     # Validate enum values
     if field.enum is not None:
-        if not isinstance(field.enum, list):
-            errors.append(f"Field '{name}': Enum must be a list")
+        if not isinstance(field.enum, tuple):
+            errors.append(f"Field '{name}': Enum must be a tuple")
         elif len(field.enum) == 0:
             errors.append(f"Field '{name}': Enum cannot be empty")
     
@@ -66,18 +58,30 @@ def validate_field(name: str, field: FieldSpec) -> List[str]:
 
 def validate_data_against_ontology(data: Dict[str, Any], ontology: Ontology) -> List[str]:
     """Validate data against ontology constraints."""
-    errors = []
-    
-    # Check if data matches any entity
-    for entity_name, entity in ontology.entities.items():
-        entity_errors = validate_data_against_entity(data, entity_name, entity)
-        if not entity_errors:
-            # Data matches this entity, no need to check others
-            break
-        errors.extend(entity_errors)
+    entities = ontology.entities
+    
+    # A "type" naming an entity dispatches straight to it; any other "type" value
+    # may be ordinary field data, so it goes through the sweep like everything else
+    entity_type = data.get("type")
+    entity = entities.get(entity_type) if isinstance(entity_type, str) else None
+    if entity is not None:
+        # The discriminator is only a field if the entity declares one
+        payload = data if "type" in entity.fields else {k: v for k, v in data.items() if k != "type"}
+        errors = validate_data_against_entity(payload, entity_type, entity)
     else:
-        # Data doesn't match any entity
-        errors.append("Data doesn't match any defined entity")
+        # Check if data matches any entity; partial-match errors only matter if none match
+        sweep_errors = []
+        for entity_name, entity in entities.items():
+            entity_errors = validate_data_against_entity(data, entity_name, entity)
+            if not entity_errors:
+                # Data matches this entity, no need to check others
+                errors = []
+                break
+            sweep_errors.extend(entity_errors)
+        else:
+            # Data doesn't match any entity
+            errors = sweep_errors
+            errors.append("Data doesn't match any defined entity")
     
     # Check constraints
     for constraint in ontology.constraints:
@@ -93,69 +97,114 @@ def validate_data_against_ontology(data: Dict[str, Any], ontology: Ontology) ->
 def validate_data_against_entity(data: Dict[str, Any], entity_name: str, entity: EntitySpec) -> List[str]:
     """Validate data against a specific entity."""
     errors = []
+    compiled = entity.compiled
     
     # Check required fields
-    for field_name, field in entity.fields.items():
-        if field.required and field_name not in data:
+    for field_name in compiled.required:
+        if field_name not in data:
             errors.append(f"Missing required field: {field_name}")
     
     # Check field types and constraints
+    fields = compiled.fields
     for field_name, field_value in data.items():
-        if field_name not in entity.fields:
+        field = fields.get(field_name)
+        if field is None:
             errors.append(f"Unknown field: {field_name}")
             continue
         
-        field_spec = entity.fields[field_name]
-        field_errors = validate_field_value(field_name, field_value, field_spec)
-        errors.extend(field_errors)
+        _check_field_value(field_name, field_value, field, errors)
     
     return errors
 
-def validate_field_value(name: str, value: Any, field: FieldSpec) -> List[str]:
-    """Validate a field value against its specification."""
-    errors = []
-    
+# Per-type (check, expected label); bool is an int subclass, so int/float exclude it
+_TYPE_CHECKERS: Dict[str, tuple[Callable[[Any], bool], str]] = {
+    "string": (lambda v: isinstance(v, str), "string"),
+    "int": (lambda v: isinstance(v, int) and not isinstance(v, bool), "int"),
+    "float": (lambda v: isinstance(v, (int, float)) and not isinstance(v, bool), "number"),
+    "bool": (lambda v: isinstance(v, bool), "bool"),
+}
+
+def _check_field_value(name: str, value: Any, field: Union[FieldSpec, CompiledField], errors: List[str]) -> None:
+    """Append type/enum/range errors for one value to errors."""
     # Type validation
-    if field.type == "string" and not isinstance(value, str):
-        errors.append(f"Field '{name}': Expected string, got {type(value).__name__}")
-    elif field.type == "int" and not isinstance(value, int):
-        errors.append(f"Field '{name}': Expected int, got {type(value).__name__}")
-    elif field.type == "float" and not isinstance(value, (int, float)):
-        errors.append(f"Field '{name}': Expected number, got {type(value).__name__}")
-    elif field.type == "bool" and not isinstance(value, bool):
-        errors.append(f"Field '{name}': Expected bool, got {type(value).__name__}")
+    checker = _TYPE_CHECKERS.get(field.type)
+    if checker is not None and not checker[0](value):
+        errors.append(f"Field '{name}': Expected {checker[1]}, got {type(value).__name__}")
     
     # Enum validation
-    if field.enum is not None and value not in field.enum:
-        errors.append(f"Field '{name}': Value '{value}' not in enum {field.enum}")
+    enum = field.enum
+    if enum is not None:
+        # Cached set lookup; unhashable values fall back to the list scan
+        try:
+            in_enum = value in field.enum_set
+        except TypeError:
+            in_enum = value in enum
+        if not in_enum:
+            errors.append(f"Field '{name}': Value '{value}' not in enum {list(enum)}")
     
     # Range validation
     if field.range is not None:
         min_val, max_val = field.range
         if value < min_val or value > max_val:
             errors.append(f"Field '{name}': Value {value} not in range [{min_val}, {max_val}]")
-    
+
+def validate_field_value(name: str, value: Any, field: FieldSpec) -> List[str]:
+    """Validate a field value against its specification."""
+    errors = []
+    _check_field_value(name, value, field, errors)
     return errors
 
+def _always_true(data: Dict[str, Any]) -> bool:
+    """Checker for expressions the simple evaluator does not understand."""
+    return True
+
+# The one expression shape the evaluator understands, e.g. "len(summary) <= 300"
+_LEN_CMP_RE = re.compile(r"^\s*len\(\s*(\w+)\s*\)\s*(<=|>=)\s*(\d+)\s*$")
+
+def _compile_constraint(expr: str) -> Callable[[Dict[str, Any]], bool]:
+    """Parse a constraint expression once into a checker over data dicts."""
+    m = _LEN_CMP_RE.match(expr)
+    if m:
+        field_name, op, bound = m.group(1), m.group(2), int(m.group(3))
+        compare = operator.le if op == "<=" else operator.ge
+        
+        def check(data: Dict[str, Any]) -> bool:
+            field_value = data.get(field_name)
+            if isinstance(field_value, str):
+                return compare(len(field_value), bound)
+            return True
+        return check
+    
+    # Anything else keeps the original split-based reading, including
+    # lazily erroring on a non-integer bound
+    if "len(" not in expr or ")" not in expr:
+        return _always_true
+    
+    field_name = expr.split("len(")[1].split(")")[0]
+    
+    # Extract comparison from expression
+    if "<=" in expr:
+        compare, bound_text = operator.le, expr.split("<=")[1].strip()
+    elif ">=" in expr:
+        compare, bound_text = operator.ge, expr.split(">=")[1].strip()
+    else:
+        return _always_true
+    
+    def check_fallback(data: Dict[str, Any]) -> bool:
+        field_value = data.get(field_name)
+        if isinstance(field_value, str):
+            return compare(len(field_value), int(bound_text))
+        return True
+    return check_fallback
+
+# Compiled checkers keyed by expression text; ontologies reuse a handful of expressions
+_CONSTRAINT_CACHE: Dict[str, Callable[[Dict[str, Any]], bool]] = {}
+
 def evaluate_constraint(data: Dict[str, Any], expr: str) -> bool:
     """Evaluate a constraint expression against data."""
     # This is a simplified implementation
     # In practice, you'd use a proper expression evaluator like `asteval` or `eval` with restricted globals
-    
-    # Simple length constraint evaluation
-    if "len(" in expr and ")" in expr:
-        field_name = expr.split("len(")[1].split(")")[0]
-        if field_name in data:
-            field_value = data[field_name]
-            if isinstance(field_value, str):
-                length = len(field_value)
-                # Extract comparison from expression
-                if "<=" in expr:
-                    max_len = int(expr.split("<=")[1].strip())
-                    return length <= max_len
-                elif ">=" in expr:
-                    min_len = int(expr.split(">=")[1].strip())
-                    return length >= min_len
-    
-    # Default to True for unknown expressions
-    return True 
\ No newline at end of file
+    check = _CONSTRAINT_CACHE.get(expr)
+    if check is None:
+        check = _CONSTRAINT_CACHE[expr] = _compile_constraint(expr)
+    return check(data)
@@ -0,0 +1,54 @@
+"""Batch compilation of many ontologies."""
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+def compile_ontology(path: Union[str, Path], outdir: Union[str, Path], tests: bool = True) -> str:
+    """Emit schemas, models, interfaces, grammar (and property tests) for one ontology."""
+    from stc.ontology.loader import load_ontology
+    from stc.emitters import emit_jsonschema, emit_pydantic_models, emit_ts_interfaces, emit_peg_grammar
+    
+    onto = load_ontology(path)
+    out = str(outdir)
+    
+    emit_jsonschema(onto, out)
+    emit_pydantic_models(onto, out)
+    emit_ts_interfaces(onto, out)
+    emit_peg_grammar(onto, out)
+    
+    if tests:
+        from stc.tests.testgen import generate_property_tests
+        schema_path = Path(out) / f"{onto.name}.schema.json"
+        generate_property_tests(str(schema_path), str(Path(out) / f"test_{onto.name}.py"))
+    
+    return out
+
+def generate_all(
+    paths: Iterable[Union[str, Path]],
+    outdir: Union[str, Path],
+    workers: Optional[int] = None,
+    tests: bool = True
+) -> List[str]:
+    """Compile every ontology into outdir/<file stem>/, fanning out over processes.
+
+    Each ontology is independent, CPU-bound work (parse + code generation), so
+    files are spread across a process pool; ``workers=1`` keeps it in-process.
+    Returns the output directory of each ontology, in input order. Raises
+    ValueError if two paths share a stem, since they would write one directory.
+    """
+    paths = [Path(p) for p in paths]
+    seen: Dict[str, Path] = {}
+    for p in paths:
+        other = seen.setdefault(p.stem, p)
+        if other is not p:
+            raise ValueError(f"Ontologies {other} and {p} would both be written to {Path(outdir) / p.stem}")
+    # Per-ontology directories: __init__.py and index.ts have fixed names
+    outdirs = [Path(outdir) / p.stem for p in paths]
+
+    if len(paths) > 1 and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(compile_ontology, paths, outdirs, repeat(tests)))
+
+    return [compile_ontology(p, d, tests) for p, d in zip(paths, outdirs)]
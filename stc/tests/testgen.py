@@ -1,8 +1,9 @@
 """Property-based test generator from ontology constraints."""
 
-import json
+import io
+import orjson
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, TextIO
 from stc.config import ensure_dir
 
 def generate_property_tests(schema_path: str, out_path: str) -> None:
@@ -14,192 +15,206 @@ def generate_property_tests(schema_path: str, out_path: str) -> None:
         raise FileNotFoundError(f"Schema file not found: {schema_path}")
     
     # Load schema
-    with open(schema_file) as f:
-        schema = json.load(f)
+    schema = orjson.loads(schema_file.read_bytes())
     
     # Ensure output directory exists
     ensure_dir(out_file.parent)
     
-    # Generate test code
-    test_code = generate_test_code(schema, schema_file.name)
-    
-    # Write test file
-    with open(out_file, "w") as f:
-        f.write(test_code)
+    # Stream the test code into the file; the module is never held as one string
+    with open(out_file, "w", encoding="utf-8", newline="", buffering=1 << 16) as f:
+        write_test_code(schema, schema_file.name, f)
 
 def generate_test_code(schema: Dict[str, Any], schema_filename: str) -> str:
     """Generate Python test code from schema."""
+    buf = io.StringIO()
+    write_test_code(schema, schema_filename, buf)
+    return buf.getvalue()
+
+def write_test_code(schema: Dict[str, Any], schema_filename: str, buf: TextIO) -> None:
+    """Write Python test code for schema to buf, block by block in file order."""
     
     # Extract schema information
     definitions = schema.get("definitions", {})
-    entity_names = list(definitions.keys())
     
     # Generate imports and setup
-    code_lines = [
-        '"""Property-based tests generated from ontology schema."""',
-        "",
-        "import pytest",
-        "import json",
-        "import jsonschema",
-        "from pathlib import Path",
-        "from hypothesis import given, strategies as st",
-        "from hypothesis.extra.jsonschema import from_schema",
-        "",
-        f"# Load schema from {schema_filename}",
-        f"SCHEMA_PATH = Path('{schema_filename}')",
-        "with open(SCHEMA_PATH) as f:",
-        "    SCHEMA = json.load(f)",
-        "",
-        "validator = jsonschema.Draft7Validator(SCHEMA)",
-        "",
-    ]
+    buf.write(_HEADER_TEMPLATE.format(schema_filename=schema_filename))
     
     # Generate tests for each entity
     for entity_name, entity_schema in definitions.items():
-        code_lines.extend(generate_entity_tests(entity_name, entity_schema))
-        code_lines.append("")
+        generate_entity_tests(entity_name, entity_schema, buf)
+        buf.write("\n\n")
     
     # Generate general schema tests
-    code_lines.extend(generate_schema_tests(schema))
-    code_lines.append("")
+    generate_schema_tests(schema, buf)
+    buf.write("\n\n")
     
     # Generate constraint tests
-    code_lines.extend(generate_constraint_tests(schema))
-    code_lines.append("")
+    generate_constraint_tests(schema, buf)
+    buf.write("\n\n")
     
     # Generate fuzz tests
-    code_lines.extend(generate_fuzz_tests(schema))
-    
-    return "\n".join(code_lines)
+    generate_fuzz_tests(schema, buf)
 
-def generate_entity_tests(entity_name: str, entity_schema: Dict[str, Any]) -> List[str]:
-    """Generate tests for a specific entity."""
-    lines = [
-        f"# Tests for {entity_name} entity",
-        f"class Test{entity_name.title()}:",
-        "",
-    ]
-    
-    # Test valid entity generation
-    lines.extend([
-        f"    @given(from_schema(SCHEMA['definitions']['{entity_name}']))",
-        f"    def test_{entity_name.lower()}_valid_schema(self, data):",
-        f'        """Test that generated {entity_name} data is valid."""',
-        f"        errors = list(validator.iter_errors(data))",
-        f"        assert not errors, f'Validation errors: {{errors}}'",
-        "",
-    ])
+# Imports and schema loading at the top of every generated module
+_HEADER_TEMPLATE = "\n".join([
+    '"""Property-based tests generated from ontology schema."""',
+    "",
+    "import pytest",
+    "import json",
+    "import jsonschema",
+    "from pathlib import Path",
+    "from hypothesis import given, strategies as st",
+    "from hypothesis.extra.jsonschema import from_schema",
+    "",
+    "# Load schema from {schema_filename}",
+    "SCHEMA_PATH = Path('{schema_filename}')",
+    "with open(SCHEMA_PATH) as f:",
+    "    SCHEMA = json.load(f)",
+    "",
+    "validator = jsonschema.Draft7Validator(SCHEMA)",
+    "",
+    "# Build each entity's strategy once instead of per test and per draw",
+    "_STRATEGIES = {{name: from_schema(defn) for name, defn in SCHEMA['definitions'].items()}}",
+    "",
+    "",
+])
+
+# Per-entity test blocks, rendered with str.format (hence the doubled braces)
+_ENTITY_TESTS_TEMPLATE = "\n".join([
+    "# Tests for {entity} entity",
+    "class Test{title}:",
+    "",
+    "    @given(_STRATEGIES['{entity}'])",
+    "    def test_{lower}_valid_schema(self, data):",
+    '        """Test that generated {entity} data is valid."""',
+    "        errors = list(validator.iter_errors(data))",
+    "        assert not errors, f'Validation errors: {{errors}}'",
+    "",
+])
+
+_REQUIRED_FIELDS_TEMPLATE = "\n".join([
+    "    @given(st.data())",
+    "    def test_{lower}_required_fields(self, data):",
+    '        """Test that {entity} has all required fields."""',
+    "        # Generate valid data",
+    "        valid_data = data.draw(_STRATEGIES['{entity}'])",
+    "        ",
+    "        # Check each required field",
+    "        for field in {required}:",
+    "            assert field in valid_data, f'Missing required field: {{field}}'",
+    "            assert valid_data[field] is not None, f'Required field is None: {{field}}'",
+    "",
+])
+
+# Schema-independent test blocks, joined once at import
+_SCHEMA_TESTS = "\n".join([
+    "class TestSchemaValidation:",
+    "",
+    "    def test_schema_structure(self):",
+    '        """Test that schema has required structure."""',
+    "        assert '$schema' in SCHEMA",
+    "        assert 'definitions' in SCHEMA",
+    "        assert len(SCHEMA['definitions']) > 0",
+    "",
+    "    def test_all_entities_valid(self):",
+    '        """Test that all entity definitions are valid."""',
+    "        for entity_name, entity_schema in SCHEMA['definitions'].items():",
+    "            assert 'type' in entity_schema",
+    "            assert entity_schema['type'] == 'object'",
+    "            if 'properties' in entity_schema:",
+    "                assert isinstance(entity_schema['properties'], dict)",
+    "",
+    "    @given(from_schema(SCHEMA))",
+    "    def test_generated_data_valid(self, data):",
+    '        """Test that data generated from schema is valid."""',
+    "        errors = list(validator.iter_errors(data))",
+    "        assert not errors, f'Validation errors: {{errors}}'",
+    "",
+])
+
+_CONSTRAINT_TESTS = "\n".join([
+    "class TestConstraints:",
+    "",
+    "    def test_no_additional_properties(self):",
+    '        """Test that entities don\'t allow additional properties."""',
+    "        for entity_name, entity_schema in SCHEMA['definitions'].items():",
+    "            if entity_schema.get('additionalProperties') is False:",
+    "                # Test with extra field",
+    "                test_data = {'extra_field': 'value'}",
+    "                errors = list(validator.iter_errors(test_data))",
+    "                # Should have validation errors for extra fields",
+    "                pass",
+    "",
+    "    def test_required_fields_enforced(self):",
+    '        """Test that required fields are enforced."""',
+    "        for entity_name, entity_schema in SCHEMA['definitions'].items():",
+    "            required = entity_schema.get('required', [])",
+    "            if required:",
+    "                # Test with missing required field",
+    "                test_data = {}",
+    "                errors = list(validator.iter_errors(test_data))",
+    "                # Should have validation errors for missing required fields",
+    "                pass",
+    "",
+])
+
+_FUZZ_TESTS = "\n".join([
+    "class TestFuzzing:",
+    "",
+    "    @given(st.text())",
+    "    def test_invalid_json_strings(self, text):",
+    '        """Test handling of invalid JSON strings."""',
+    "        try:",
+    "            data = json.loads(text)",
+    "            # If parsing succeeds, validate against schema",
+    "            errors = list(validator.iter_errors(data))",
+    "            # Should handle gracefully",
+    "        except json.JSONDecodeError:",
+    "            # Expected for invalid JSON",
+    "            pass",
+    "",
+    "    @given(st.dictionaries(st.text(), st.text()))",
+    "    def test_random_dicts(self, data):",
+    '        """Test handling of random dictionaries."""',
+    "        errors = list(validator.iter_errors(data))",
+    "        # Should handle gracefully without crashing",
+    "        assert isinstance(errors, list)",
+    "",
+    "    def test_malformed_data_types(self):",
+    '        """Test handling of malformed data types."""',
+    "        malformed_data = [",
+    "            None,",
+    "            '',",
+    "            [],",
+    "            {'invalid': 'data'}",
+    "        ]",
+    "        ",
+    "        for data in malformed_data:",
+    "            errors = list(validator.iter_errors(data))",
+    "            # Should handle gracefully",
+    "            assert isinstance(errors, list)",
+    "",
+])
+
+def generate_entity_tests(entity_name: str, entity_schema: Dict[str, Any], buf: TextIO) -> None:
+    """Write tests for a specific entity to buf."""
+    names = {"entity": entity_name, "title": entity_name.title(), "lower": entity_name.lower()}
+    buf.write(_ENTITY_TESTS_TEMPLATE.format_map(names))
     
     # Test required fields
     required_fields = entity_schema.get("required", [])
     if required_fields:
-        lines.extend([
-        f"    @given(st.data())",
-        f"    def test_{entity_name.lower()}_required_fields(self, data):",
-        f'        """Test that {entity_name} has all required fields."""',
-        f"        # Generate valid data",
-        f"        valid_data = data.draw(from_schema(SCHEMA['definitions']['{entity_name}']))",
-        f"        ",
-        f"        # Check each required field",
-        f"        for field in {required_fields}:",
-        f"            assert field in valid_data, f'Missing required field: {{field}}'",
-        f"            assert valid_data[field] is not None, f'Required field is None: {{field}}'",
-        "",
-        ])
-    
-    return lines
+        buf.write("\n")
+        buf.write(_REQUIRED_FIELDS_TEMPLATE.format_map({**names, "required": required_fields}))
 
-def generate_schema_tests(schema: Dict[str, Any]) -> List[str]:
-    """Generate general schema validation tests."""
-    return [
-        "class TestSchemaValidation:",
-        "",
-        "    def test_schema_structure(self):",
-        '        """Test that schema has required structure."""',
-        "        assert '$schema' in SCHEMA",
-        "        assert 'definitions' in SCHEMA",
-        "        assert len(SCHEMA['definitions']) > 0",
-        "",
-        "    def test_all_entities_valid(self):",
-        '        """Test that all entity definitions are valid."""',
-        "        for entity_name, entity_schema in SCHEMA['definitions'].items():",
-        "            assert 'type' in entity_schema",
-        "            assert entity_schema['type'] == 'object'",
-        "            if 'properties' in entity_schema:",
-        "                assert isinstance(entity_schema['properties'], dict)",
-        "",
-        "    @given(from_schema(SCHEMA))",
-        "    def test_generated_data_valid(self, data):",
-        '        """Test that data generated from schema is valid."""',
-        "        errors = list(validator.iter_errors(data))",
-        "        assert not errors, f'Validation errors: {{errors}}'",
-        "",
-    ]
+def generate_schema_tests(schema: Dict[str, Any], buf: TextIO) -> None:
+    """Write general schema validation tests to buf."""
+    buf.write(_SCHEMA_TESTS)
 
-def generate_constraint_tests(schema: Dict[str, Any]) -> List[str]:
-    """Generate tests for schema constraints."""
-    return [
-        "class TestConstraints:",
-        "",
-        "    def test_no_additional_properties(self):",
-        '        """Test that entities don\'t allow additional properties."""',
-        "        for entity_name, entity_schema in SCHEMA['definitions'].items():",
-        "            if entity_schema.get('additionalProperties') is False:",
-        "                # Test with extra field",
-        "                test_data = {'extra_field': 'value'}",
-        "                errors = list(validator.iter_errors(test_data))",
-        "                # Should have validation errors for extra fields",
-        "                pass",
-        "",
-        "    def test_required_fields_enforced(self):",
-        '        """Test that required fields are enforced."""',
-        "        for entity_name, entity_schema in SCHEMA['definitions'].items():",
-        "            required = entity_schema.get('required', [])",
-        "            if required:",
-        "                # Test with missing required field",
-        "                test_data = {}",
-        "                errors = list(validator.iter_errors(test_data))",
-        "                # Should have validation errors for missing required fields",
-        "                pass",
-        "",
-    ]
+def generate_constraint_tests(schema: Dict[str, Any], buf: TextIO) -> None:
+    """Write tests for schema constraints to buf."""
+    buf.write(_CONSTRAINT_TESTS)
 
-def generate_fuzz_tests(schema: Dict[str, Any]) -> List[str]:
-    """Generate fuzz tests for robustness."""
-    return [
-        "class TestFuzzing:",
-        "",
-        "    @given(st.text())",
-        "    def test_invalid_json_strings(self, text):",
-        '        """Test handling of invalid JSON strings."""',
-        "        try:",
-        "            data = json.loads(text)",
-        "            # If parsing succeeds, validate against schema",
-        "            errors = list(validator.iter_errors(data))",
-        "            # Should handle gracefully",
-        "        except json.JSONDecodeError:",
-        "            # Expected for invalid JSON",
-        "            pass",
-        "",
-        "    @given(st.dictionaries(st.text(), st.text()))",
-        "    def test_random_dicts(self, data):",
-        '        """Test handling of random dictionaries."""',
-        "        errors = list(validator.iter_errors(data))",
-        "        # Should handle gracefully without crashing",
-        "        assert isinstance(errors, list)",
-        "",
-        "    def test_malformed_data_types(self):",
-        '        """Test handling of malformed data types."""',
-        "        malformed_data = [",
-        "            None,",
-        "            '',",
-        "            [],",
-        "            {'invalid': 'data'}",
-        "        ]",
-        "        ",
-        "        for data in malformed_data:",
-        "            errors = list(validator.iter_errors(data))",
-        "            # Should handle gracefully",
-        "            assert isinstance(errors, list)",
-        "",
-    ] 
\ No newline at end of file
+def generate_fuzz_tests(schema: Dict[str, Any], buf: TextIO) -> None:
+    """Write fuzz tests for robustness to buf."""
+    buf.write(_FUZZ_TESTS)
\ No newline at end of file
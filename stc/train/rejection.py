@@ -1,12 +1,170 @@
 """Schema-aware rejection sampling for model training."""
 
-import json
+import logging
+import operator
+import os
+import re
+import orjson
 import jsonschema
-from typing import Dict, Any, List, Optional, Callable
+from pathlib import Path
+from typing import Dict, Any, List, NamedTuple, Optional, Callable
 from dataclasses import dataclass
+from collections import OrderedDict
+from functools import lru_cache
 from transformers import PreTrainedTokenizer
 import torch
 
+try:
+    import fastjsonschema
+except ImportError:  # jsonschema validators interpret the schema instead
+    fastjsonschema = None
+
+logger = logging.getLogger(__name__)
+
+# Training runs stay quiet about individual rejections unless asked; an
+# application that already configured "stc.train" keeps its level
+_train_logger = logging.getLogger("stc.train")
+if _train_logger.level == logging.NOTSET:
+    _train_logger.setLevel(logging.WARNING)
+
+# Characters that matter to brace matching; everything else is skipped in C
+_JSON_STRUCTURE_RE = re.compile(r'[{}"\\]')
+
+def _try_json(text: str) -> Optional[Any]:
+    """orjson.loads, or None if text is not valid JSON."""
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        return None
+
+def _find_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """Return the first balanced {...} span of text that parses as JSON.
+    
+    One left-to-right pass matches braces outside string literals (honouring
+    backslash escapes). Top-level objects are tried as they close; objects
+    nested in one that fails to parse, or in one that never closes, are tried
+    afterwards in start order. Falls back to parsing the whole text.
+    """
+    stack: List[int] = []
+    nested: List[tuple[int, int]] = []
+    in_string = False
+    skip = -1
+    
+    for m in _JSON_STRUCTURE_RE.finditer(text):
+        i = m.start()
+        if i == skip:
+            continue
+        c = text[i]
+        if in_string:
+            if c == "\\":
+                skip = i + 1
+            elif c == '"':
+                in_string = False
+        elif c == "{":
+            stack.append(i)
+        elif not stack:
+            # Quotes and stray braces in the surrounding prose
+            continue
+        elif c == '"':
+            in_string = True
+        elif c == "}":
+            start = stack.pop()
+            if stack:
+                nested.append((start, i))
+                continue
+            parsed = _try_json(text[start:i + 1])
+            if parsed is not None:
+                return parsed
+            for inner_start, inner_end in sorted(nested):
+                parsed = _try_json(text[inner_start:inner_end + 1])
+                if parsed is not None:
+                    return parsed
+            nested.clear()
+    
+    for inner_start, inner_end in sorted(nested):
+        parsed = _try_json(text[inner_start:inner_end + 1])
+        if parsed is not None:
+            return parsed
+    
+    # If no JSON found, try to parse the entire text
+    return _try_json(text)
+
+# Decoded candidates whose validation result SchemaAwareSampler remembers
+_VALIDATION_CACHE_SIZE = 256
+
+class _CompiledSchema(NamedTuple):
+    """A loaded schema plus everything SchemaAwareSampler derives from it; shared, read-only."""
+    schema: Dict[str, Any]
+    validator: jsonschema.Draft7Validator
+    definitions: Dict[str, Dict[str, Any]]
+    entity_validators: Dict[str, jsonschema.Draft7Validator]
+    required_by_type: Dict[str, tuple]
+    # fastjsonschema-compiled equivalents of validator/entity_validators, if installed
+    fast_validator: Optional[Callable[[Any], Any]]
+    fast_entity_validators: Dict[str, Callable[[Any], Any]]
+
+def _entity_schemas(schema: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Per-entity variants of a root that dispatches on "type"; {} for any other root.
+    
+    The root must be a oneOf/anyOf of plain #/definitions/<name> refs whose targets
+    each pin "type" to their own name, so output["type"] alone picks the one branch
+    that can match. Each variant is the root with only that branch left, keeping
+    its other keywords and its definitions for $ref resolution.
+    """
+    key = "oneOf" if "oneOf" in schema else "anyOf"
+    branches = schema.get(key)
+    if not isinstance(branches, list):
+        return {}
+    
+    definitions = schema.get("definitions", {})
+    entity_schemas = {}
+    for branch in branches:
+        ref = branch.get("$ref") if isinstance(branch, dict) and len(branch) == 1 else None
+        if not isinstance(ref, str) or not ref.startswith("#/definitions/"):
+            return {}
+        name = ref[len("#/definitions/"):]
+        sub = definitions.get(name)
+        pinned = sub.get("properties", {}).get("type") if isinstance(sub, dict) else None
+        if not isinstance(pinned, dict) or name in entity_schemas:
+            return {}
+        if pinned.get("const") != name and pinned.get("enum") != [name]:
+            return {}
+        entity_schemas[name] = {**schema, key: [branch]}
+    return entity_schemas
+
+@lru_cache(maxsize=16)
+def _load_and_compile(path: str, mtime_ns: int) -> _CompiledSchema:
+    """Read, check and compile a schema file; mtime_ns in the key invalidates on edits."""
+    schema = orjson.loads(Path(path).read_bytes())
+    # Check the schema once up front; candidates then only pay for validation
+    jsonschema.Draft7Validator.check_schema(schema)
+    definitions = schema.get("definitions", {})
+    # Only a "type"-discriminated root can be narrowed to one entity per candidate
+    entity_schemas = _entity_schemas(schema)
+    
+    fast_validator, fast_entity_validators = None, {}
+    if fastjsonschema is not None:
+        # Generated straight-line Python; use_default=False keeps candidates unmodified.
+        # The entity variants carry the root definitions, so internal refs resolve
+        try:
+            fast_validator = fastjsonschema.compile(schema, use_default=False)
+            fast_entity_validators = {
+                name: fastjsonschema.compile(sub, use_default=False) for name, sub in entity_schemas.items()
+            }
+        except fastjsonschema.JsonSchemaDefinitionException:
+            # Something fastjsonschema cannot compile: use the jsonschema validators
+            fast_validator, fast_entity_validators = None, {}
+    
+    return _CompiledSchema(
+        schema=schema,
+        validator=jsonschema.Draft7Validator(schema),
+        definitions=definitions,
+        entity_validators={name: jsonschema.Draft7Validator(sub) for name, sub in entity_schemas.items()},
+        required_by_type={name: tuple(sub.get("required", ())) for name, sub in definitions.items()},
+        fast_validator=fast_validator,
+        fast_entity_validators=fast_entity_validators,
+    )
+
 @dataclass
 class RejectionConfig:
     """Configuration for rejection sampling."""
@@ -23,18 +181,34 @@ class SchemaAwareSampler:
     def __init__(self, config: RejectionConfig, tokenizer: PreTrainedTokenizer):
         self.config = config
         self.tokenizer = tokenizer
-        self.schema = self._load_schema()
-        self.validator = jsonschema.Draft7Validator(self.schema)
+        # Read once; generate() is handed it for both pad and eos
+        self._eos = tokenizer.eos_token_id
+        compiled = self._load_schema()
+        self.schema = compiled.schema
+        self.validator = compiled.validator
         self.custom_validators = []
+        
+        # Per-entity lookups, built once instead of re-walking the schema per candidate
+        self._definitions = compiled.definitions
+        self._entity_validators = compiled.entity_validators
+        self._required_by_type = compiled.required_by_type
+        self._fast_validator = compiled.fast_validator
+        self._fast_entity_validators = compiled.fast_entity_validators
+        
+        # Decoded text -> is_valid, or None when no JSON was found;
+        # low-temperature sampling often repeats a candidate verbatim
+        self._validation_cache: "OrderedDict[str, Optional[bool]]" = OrderedDict()
     
-    def _load_schema(self) -> Dict[str, Any]:
-        """Load JSON schema from file."""
-        with open(self.config.schema_path) as f:
-            return json.load(f)
+    def _load_schema(self) -> "_CompiledSchema":
+        """Load JSON schema from file, reusing the compiled form while unchanged."""
+        path = self.config.schema_path
+        return _load_and_compile(path, os.stat(path).st_mtime_ns)
     
     def add_custom_validator(self, validator: Callable[[Dict[str, Any]], bool]) -> None:
         """Add a custom validation function."""
         self.custom_validators.append(validator)
+        # Earlier results did not run this validator
+        self._validation_cache.clear()
     
     def validate_output(self, output: Dict[str, Any]) -> tuple[bool, List[str]]:
         """Validate output against schema and constraints."""
@@ -42,10 +216,26 @@ class SchemaAwareSampler:
         
         # Schema validation
         if self.config.enable_schema_validation:
-            try:
-                self.validator.validate(output)
-            except jsonschema.ValidationError as e:
-                errors.append(f"Schema validation failed: {e.message}")
+            # On a "type"-discriminated root, validate against just the named entity
+            entity_type = output.get("type")
+            if self._is_unknown_type(output):
+                # No entity to validate against; skip the schema walk entirely
+                return False, [f"Unknown entity type: {entity_type}"]
+            if not isinstance(entity_type, str):
+                entity_type = None
+            
+            if self._fast_validator is not None:
+                fast = self._fast_entity_validators.get(entity_type, self._fast_validator)
+                try:
+                    fast(output)
+                except fastjsonschema.JsonSchemaException as e:
+                    errors.append(f"Schema validation failed: {e.message}")
+            else:
+                validator = self._entity_validators.get(entity_type, self.validator)
+                try:
+                    validator.validate(output)
+                except jsonschema.ValidationError as e:
+                    errors.append(f"Schema validation failed: {e.message}")
         
         # Grammar constraints
         if self.config.enable_grammar_constraints:
@@ -63,25 +253,73 @@ class SchemaAwareSampler:
         
         return len(errors) == 0, errors
     
+    def _validate_output_fast(self, output: Dict[str, Any]) -> bool:
+        """validate_output's verdict only: stops at the first failure and builds no messages."""
+        if self.config.enable_schema_validation:
+            if self._is_unknown_type(output):
+                return False
+            entity_type = output.get("type")
+            if not isinstance(entity_type, str):
+                entity_type = None
+            
+            if self._fast_validator is not None:
+                try:
+                    self._fast_entity_validators.get(entity_type, self._fast_validator)(output)
+                except fastjsonschema.JsonSchemaException:
+                    return False
+            elif not self._entity_validators.get(entity_type, self.validator).is_valid(output):
+                return False
+        
+        if self.config.enable_grammar_constraints:
+            if "type" in output:
+                for field in self._required_by_type.get(output["type"], ()):
+                    if field not in output:
+                        return False
+            
+            definitions = self._definitions
+            for field_name, field_value in output.items():
+                field_schema = definitions.get(field_name)
+                if field_schema is not None and self._validate_field_constraints(field_value, field_schema):
+                    return False
+        
+        if self.config.enable_custom_validators:
+            for validator in self.custom_validators:
+                try:
+                    if not validator(output):
+                        return False
+                except Exception:
+                    return False
+        
+        return True
+    
+    def _is_unknown_type(self, output: Dict[str, Any]) -> bool:
+        """Whether output's "type" names no entity of a "type"-discriminated root.
+        
+        Only there does every branch pin "type", so an unlisted value cannot match;
+        on any other root "type" is ordinary data and the schema decides.
+        """
+        # Populated only for discriminated roots (see _entity_schemas)
+        entity_types = self._entity_validators
+        if not entity_types or "type" not in output:
+            return False
+        entity_type = output["type"]
+        return not isinstance(entity_type, str) or entity_type not in entity_types
+    
     def _check_grammar_constraints(self, output: Dict[str, Any]) -> List[str]:
         """Check grammar-based constraints."""
         errors = []
         
         # Check for required fields based on entity type
         if "type" in output:
-            entity_type = output["type"]
-            if entity_type in self.schema.get("definitions", {}):
-                entity_schema = self.schema["definitions"][entity_type]
-                required_fields = entity_schema.get("required", [])
-                
-                for field in required_fields:
-                    if field not in output:
-                        errors.append(f"Missing required field: {field}")
+            for field in self._required_by_type.get(output["type"], ()):
+                if field not in output:
+                    errors.append(f"Missing required field: {field}")
         
         # Check field value constraints
+        definitions = self._definitions
         for field_name, field_value in output.items():
-            if field_name in self.schema.get("definitions", {}):
-                field_schema = self.schema["definitions"][field_name]
+            field_schema = definitions.get(field_name)
+            if field_schema is not None:
                 field_errors = self._validate_field_constraints(field_value, field_schema)
                 errors.extend(field_errors)
         
@@ -121,63 +359,59 @@ class SchemaAwareSampler:
     
     def sample_with_rejection(self, model, input_ids: torch.Tensor, max_length: int = 512) -> torch.Tensor:
         """Generate output with rejection sampling."""
-        for attempt in range(self.config.max_rejection_attempts):
-            # Generate candidate output
-            with torch.no_grad():
-                outputs = model.generate(
-                    input_ids,
-                    max_length=max_length,
-                    do_sample=True,
-                    temperature=0.7,
-                    top_p=0.9,
-                    pad_token_id=self.tokenizer.eos_token_id,
-                    eos_token_id=self.tokenizer.eos_token_id,
-                )
-            
-            # Decode the generated text
-            generated_text = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-            
+        # Sample every candidate in one generate call: the prompt is prefilled
+        # once and the candidates decode as a batch
+        with torch.inference_mode():
+            outputs = model.generate(
+                input_ids,
+                max_length=max_length,
+                do_sample=True,
+                temperature=0.7,
+                top_p=0.9,
+                num_return_sequences=self.config.max_rejection_attempts,
+                use_cache=True,
+                return_dict_in_generate=False,
+                pad_token_id=self._eos,
+                eos_token_id=self._eos,
+            )
+        
+        # Decode the generated text
+        generated_texts = self.tokenizer.batch_decode(outputs, skip_special_tokens=True)
+        
+        for attempt, generated_text in enumerate(generated_texts):
             # Try to parse as JSON
             try:
-                parsed_output = self._extract_json_from_text(generated_text)
-                if parsed_output is not None:
-                    # Validate the parsed output
-                    is_valid, errors = self.validate_output(parsed_output)
-                    if is_valid:
-                        return outputs[0]
-                    else:
-                        print(f"Rejection attempt {attempt + 1}: {errors}")
+                # Only the verdict is needed here; validate_output() gives the reasons
+                is_valid = self._validate_text(generated_text)
+                if is_valid:
+                    return outputs[attempt]
+                elif is_valid is not None:
+                    logger.debug("Rejection attempt %d: output failed validation", attempt + 1)
             except Exception as e:
-                print(f"Parsing error in attempt {attempt + 1}: {e}")
+                logger.debug("Parsing error in attempt %d: %s", attempt + 1, e)
         
-        # If all attempts failed, return the last generated output
-        print("Warning: All rejection sampling attempts failed, returning last output")
+        # If all attempts failed, return the first generated output
+        logger.warning("All rejection sampling attempts failed, returning first output")
         return outputs[0]
     
+    def _validate_text(self, text: str) -> Optional[bool]:
+        """Extract and check a candidate (None if no JSON), reusing the verdict for text seen recently."""
+        cache = self._validation_cache
+        if text in cache:
+            cache.move_to_end(text)
+            return cache[text]
+        
+        parsed_output = self._extract_json_from_text(text)
+        result = None if parsed_output is None else self._validate_output_fast(parsed_output)
+        
+        cache[text] = result
+        if len(cache) > _VALIDATION_CACHE_SIZE:
+            cache.popitem(last=False)
+        return result
+    
     def _extract_json_from_text(self, text: str) -> Optional[Dict[str, Any]]:
         """Extract JSON from generated text."""
-        # Look for JSON-like structures in the text
-        import re
-        
-        # Try to find JSON object patterns
-        json_patterns = [
-            r'\{[^{}]*\}',  # Simple JSON object
-            r'\{.*\}',      # More complex JSON object
-        ]
-        
-        for pattern in json_patterns:
-            matches = re.findall(pattern, text, re.DOTALL)
-            for match in matches:
-                try:
-                    return json.loads(match)
-                except json.JSONDecodeError:
-                    continue
-        
-        # If no JSON found, try to parse the entire text
-        try:
-            return json.loads(text)
-        except json.JSONDecodeError:
-            return None
+        return _find_json_object(text)
     
     def create_training_hook(self) -> Callable:
         """Create a training hook for rejection sampling."""
@@ -189,99 +423,177 @@ class SchemaAwareSampler:
         
         return rejection_hook
 
+# Patterns for ConstraintValidator, compiled once at import
+_LEN_RE = re.compile(r'len\((\w+)\)\s*([<>=]+)\s*(\d+)')
+_CMP_RE = re.compile(r'(\w+)\s*([<>=!]+)\s*([^<>=!]+)')
+
+# Comparison operators by spelling; length constraints only ever supported the ordering ones
+_OPS = {
+    "<=": operator.le,
+    ">=": operator.ge,
+    "<": operator.lt,
+    ">": operator.gt,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+_LEN_OPS = {op: _OPS[op] for op in ("<=", ">=", "<", ">")}
+
+# NumPy ufunc names for each comparison, used by ConstraintValidator.validate_batch
+_NP_UFUNCS = {
+    operator.le: "less_equal",
+    operator.ge: "greater_equal",
+    operator.lt: "less",
+    operator.gt: "greater",
+    operator.eq: "equal",
+    operator.ne: "not_equal",
+}
+
+# Ints beyond this lose precision as float64, so they are compared in Python
+_FLOAT_EXACT_INT = 2 ** 53
+
+# Stands in for an absent field in validate_batch (None is a real value)
+_MISSING = object()
+
+# Parsed form of a constraint the evaluator does not understand (always passes)
+_UNKNOWN_CONSTRAINT = ("unknown", None, None, None)
+
 class ConstraintValidator:
     """Validator for complex constraints."""
     
     def __init__(self, constraints: List[str]):
         self.constraints = constraints
+        # (kind, field, compare, value) per constraint, so validate() does no string parsing
+        self._parsed_constraints = [self._parse_constraint(c) for c in constraints]
     
     def validate(self, data: Dict[str, Any]) -> tuple[bool, List[str]]:
         """Validate data against constraints."""
         errors = []
         
-        for constraint in self.constraints:
-            if not self._evaluate_constraint(data, constraint):
+        for constraint, parsed in zip(self.constraints, self._parsed_constraints):
+            if not self._evaluate_parsed(data, parsed):
                 errors.append(f"Constraint failed: {constraint}")
         
         return len(errors) == 0, errors
     
-    def _evaluate_constraint(self, data: Dict[str, Any], constraint: str) -> bool:
-        """Evaluate a single constraint."""
+    def is_valid(self, data: Dict[str, Any]) -> bool:
+        """Like validate(), but stops at the first failing constraint."""
+        return all(self._evaluate_parsed(data, parsed) for parsed in self._parsed_constraints)
+    
+    def validate_batch(self, data_list: List[Dict[str, Any]]) -> List[bool]:
+        """is_valid() for many candidates at once; each constraint is one vectorized comparison."""
         try:
-            # Simple constraint evaluation
-            # In practice, you'd use a proper expression evaluator
-            
-            # Handle length constraints
-            if "len(" in constraint and ")" in constraint:
-                return self._evaluate_length_constraint(data, constraint)
+            import numpy as np
+        except ImportError:
+            return [self.is_valid(data) for data in data_list]
+        
+        n = len(data_list)
+        mask = np.ones(n, dtype=bool)
+        for parsed in self._parsed_constraints:
+            kind, field, compare, value = parsed
+            if compare is None or kind not in ("len", "cmp"):
+                # Unsupported operators and unknown constraints always pass
+                continue
+            ufunc = getattr(np, _NP_UFUNCS[compare])
+            values = [data.get(field) if field in data else _MISSING for data in data_list]
             
-            # Handle comparison constraints
-            if any(op in constraint for op in ["<=", ">=", "<", ">", "==", "!="]):
-                return self._evaluate_comparison_constraint(data, constraint)
+            if kind == "len":
+                # Only string values are length-checked; everything else passes
+                checked = np.fromiter((isinstance(v, str) for v in values), dtype=bool, count=n)
+                lengths = np.fromiter((len(v) if isinstance(v, str) else 0 for v in values), dtype=np.int64, count=n)
+                mask &= ~checked | ufunc(lengths, value)
+                continue
             
-            # Default to True for unknown constraints
+            try:
+                bound = float(value)
+            except ValueError:
+                bound = None
+            # Numbers compare against the float bound in one ufunc call; strings and
+            # other values keep the scalar rules (quote stripping, TypeError -> pass)
+            numeric = np.fromiter(
+                (
+                    bound is not None and not isinstance(v, bool) and (
+                        isinstance(v, float) or (isinstance(v, int) and -_FLOAT_EXACT_INT <= v <= _FLOAT_EXACT_INT)
+                    )
+                    for v in values
+                ),
+                dtype=bool,
+                count=n,
+            )
+            numbers = np.fromiter((v if ok else 0.0 for v, ok in zip(values, numeric)), dtype=np.float64, count=n)
+            ok = ufunc(numbers, bound if bound is not None else 0.0) & numeric
+            for i in np.flatnonzero(~numeric).tolist():
+                ok[i] = values[i] is _MISSING or self._evaluate_parsed(data_list[i], parsed)
+            mask &= ok
+        
+        return mask.tolist()
+    
+    @staticmethod
+    def _parse_constraint(constraint: str) -> tuple:
+        """Parse a constraint string once into (kind, field, compare, value); compare is None for unsupported ops."""
+        # Simple constraint evaluation
+        # In practice, you'd use a proper expression evaluator
+        
+        # Handle length constraints: len(field) <= value
+        if "len(" in constraint and ")" in constraint:
+            match = _LEN_RE.search(constraint)
+            if match:
+                field, op, value = match.groups()
+                return ("len", field, _LEN_OPS.get(op), int(value))
+            return _UNKNOWN_CONSTRAINT
+        
+        # Handle comparison constraints: field op value
+        if any(op in constraint for op in ["<=", ">=", "<", ">", "==", "!="]):
+            match = _CMP_RE.search(constraint)
+            if match:
+                field, op, value = match.groups()
+                return ("cmp", field, _OPS.get(op), value)
+        
+        # Default to True for unknown constraints
+        return _UNKNOWN_CONSTRAINT
+    
+    def _evaluate_constraint(self, data: Dict[str, Any], constraint: str) -> bool:
+        """Evaluate a single constraint."""
+        return self._evaluate_parsed(data, self._parse_constraint(constraint))
+    
+    def _evaluate_parsed(self, data: Dict[str, Any], parsed: tuple) -> bool:
+        """Evaluate a pre-parsed constraint."""
+        kind, field, compare, value = parsed
+        try:
+            if kind == "len":
+                return self._evaluate_length_constraint(data, field, compare, value)
+            if kind == "cmp":
+                return self._evaluate_comparison_constraint(data, field, compare, value)
             return True
         except Exception:
             return False
     
-    def _evaluate_length_constraint(self, data: Dict[str, Any], constraint: str) -> bool:
+    def _evaluate_length_constraint(
+        self, data: Dict[str, Any], field: str, compare: Optional[Callable[[Any, Any], bool]], value: int
+    ) -> bool:
         """Evaluate length-based constraints."""
-        import re
-        
-        # Parse len(field) <= value
-        match = re.search(r'len\((\w+)\)\s*([<>=]+)\s*(\d+)', constraint)
-        if match:
-            field, op, value = match.groups()
-            value = int(value)
-            
-            if field in data:
-                field_value = data[field]
-                if isinstance(field_value, str):
-                    length = len(field_value)
-                    
-                    if op == "<=":
-                        return length <= value
-                    elif op == ">=":
-                        return length >= value
-                    elif op == "<":
-                        return length < value
-                    elif op == ">":
-                        return length > value
+        if compare is not None and field in data:
+            field_value = data[field]
+            if isinstance(field_value, str):
+                return compare(len(field_value), value)
         
         return True
     
-    def _evaluate_comparison_constraint(self, data: Dict[str, Any], constraint: str) -> bool:
+    def _evaluate_comparison_constraint(
+        self, data: Dict[str, Any], field: str, compare: Optional[Callable[[Any, Any], bool]], value: str
+    ) -> bool:
         """Evaluate comparison constraints."""
-        import re
-        
-        # Parse field op value
-        match = re.search(r'(\w+)\s*([<>=!]+)\s*([^<>=!]+)', constraint)
-        if match:
-            field, op, value = match.groups()
+        if compare is not None and field in data:
+            field_value = data[field]
             
-            if field in data:
-                field_value = data[field]
+            # Try to convert value to appropriate type
+            try:
+                if isinstance(field_value, (int, float)):
+                    value = float(value)
+                elif isinstance(field_value, str):
+                    value = value.strip('"\'')
                 
-                # Try to convert value to appropriate type
-                try:
-                    if isinstance(field_value, (int, float)):
-                        value = float(value)
-                    elif isinstance(field_value, str):
-                        value = value.strip('"\'')
-                    
-                    if op == "<=":
-                        return field_value <= value
-                    elif op == ">=":
-                        return field_value >= value
-                    elif op == "<":
-                        return field_value < value
-                    elif op == ">":
-                        return field_value > value
-                    elif op == "==":
-                        return field_value == value
-                    elif op == "!=":
-                        return field_value != value
-                except (ValueError, TypeError):
-                    pass
-        
-        return True 
\ No newline at end of file
+                return compare(field_value, value)
+            except (ValueError, TypeError):
+                pass
+        
+        return True
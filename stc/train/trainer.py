@@ -1,20 +1,31 @@
 """Model training with schema-aware rejection sampling."""
 
+import importlib.util
 import json
+import os
+import orjson
+import jsonschema
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Callable, Literal, Optional
 from transformers import (
     AutoModelForCausalLM, 
     AutoTokenizer, 
     Trainer, 
     TrainingArguments,
-    DataCollatorForLanguageModeling
+    DataCollatorForLanguageModeling,
+    BitsAndBytesConfig
 )
 from datasets import load_dataset
-from peft import LoraConfig, get_peft_model, TaskType
+from peft import LoraConfig, get_peft_model, prepare_model_for_kbit_training, TaskType
 import torch
 from stc.config import ensure_dir
 
+try:
+    import fastjsonschema
+except ImportError:  # jsonschema's Draft7Validator interprets the schema instead
+    fastjsonschema = None
+
 def train_model(
     base: str,
     data: str,
@@ -22,7 +33,8 @@ def train_model(
     decoder: str,
     out: str,
     lora: bool = True,
-    epochs: int = 3
+    epochs: int = 3,
+    parallel: Literal["ddp", "fsdp", "auto"] = "auto"
 ) -> None:
     """
     Fine-tune a domain-specific model with schema-aware rejection sampling.
@@ -33,8 +45,47 @@ def train_model(
     
     # Load model and tokenizer
     print(f"Loading base model: {base}")
+    # bf16 on GPUs that support it (no loss scaler, fp32 exponent range); fp16 otherwise
+    cuda = torch.cuda.is_available()
+    use_bf16 = cuda and torch.cuda.is_bf16_supported()
+    if cuda:
+        # TF32 tensor-core matmuls for whatever still runs in fp32
+        torch.backends.cuda.matmul.allow_tf32 = True
+        torch.backends.cudnn.allow_tf32 = True
+    
     tokenizer = AutoTokenizer.from_pretrained(base)
-    model = AutoModelForCausalLM.from_pretrained(base)
+    # QLoRA: LoRA on CUDA with bitsandbytes stores the frozen trunk as 4-bit NF4.
+    # FSDP would need matching quant storage dtypes, so it keeps full-width weights
+    quantize = lora and cuda and parallel != "fsdp" and importlib.util.find_spec("bitsandbytes") is not None
+    load_kwargs: Dict[str, Any] = {}
+    if quantize:
+        load_kwargs["quantization_config"] = BitsAndBytesConfig(
+            load_in_4bit=True,
+            bnb_4bit_use_double_quant=True,
+            bnb_4bit_quant_type="nf4",
+            bnb_4bit_compute_dtype=torch.bfloat16 if use_bf16 else torch.float16,
+        )
+        # Under torchrun each rank holds the whole model on its own GPU
+        world_size = int(os.environ.get("WORLD_SIZE", "1"))
+        load_kwargs["device_map"] = {"": int(os.environ.get("LOCAL_RANK", "0"))} if world_size > 1 else "auto"
+    
+    # LoRA only trains adapters, so the frozen base can load straight in bf16;
+    # full fine-tuning keeps fp32 master weights under bf16 autocast
+    model = AutoModelForCausalLM.from_pretrained(
+        base,
+        torch_dtype=torch.bfloat16 if use_bf16 and lora else None,
+        **load_kwargs,
+    )
+    if quantize:
+        # fp32 norms/head and checkpointing hooks that 4-bit training needs
+        model = prepare_model_for_kbit_training(
+            model,
+            use_gradient_checkpointing=True,
+            gradient_checkpointing_kwargs={"use_reentrant": False},
+        )
+    
+    # Pick the multi-GPU strategy from the base model's size
+    parallel_args = _parallel_args(model, parallel)
     
     # Add padding token if not present
     if tokenizer.pad_token is None:
@@ -54,6 +105,11 @@ def train_model(
         model = get_peft_model(model, lora_config)
         model.print_trainable_parameters()
     
+    # The KV cache is useless under gradient checkpointing; off up front keeps the graph static
+    model.config.use_cache = False
+    # TorchInductor fuses the frozen linears with the LoRA A/B matmuls; STC_NO_COMPILE=1 runs eager
+    use_compile = cuda and hasattr(torch, "compile") and os.environ.get("STC_NO_COMPILE") != "1"
+    
     # Load dataset
     print(f"Loading dataset: {data}")
     dataset = load_dataset("json", data_files=data, split="train")
@@ -82,15 +138,33 @@ def train_model(
         warmup_steps=100,
         learning_rate=5e-5,
         weight_decay=0.01,
-        fp16=torch.cuda.is_available(),
-        dataloader_pin_memory=False,
-        remove_unused_columns=False,
+        bf16=use_bf16,
+        fp16=cuda and not use_bf16,
+        # Recompute activations in backward; non-reentrant works with PEFT adapters
+        gradient_checkpointing=True,
+        gradient_checkpointing_kwargs={"use_reentrant": False},
+        # Page-locked batches and worker prefetch overlap H2D copies with compute;
+        # a small prefetch factor keeps host memory bounded
+        dataloader_pin_memory=torch.cuda.is_available(),
+        dataloader_num_workers=max(2, (os.cpu_count() or 2) // 2),
+        dataloader_persistent_workers=True,
+        dataloader_prefetch_factor=2,
+        # Batch similar lengths together so short rows aren't padded to a long outlier;
+        # "length" only feeds the sampler and is dropped before the forward pass
+        group_by_length=True,
+        length_column_name="length",
+        # Trainer compiles the model itself and unwraps it again for checkpoints
+        torch_compile=use_compile,
+        torch_compile_mode="default" if use_compile else None,
+        **parallel_args,
     )
     
     # Create data collator
     data_collator = DataCollatorForLanguageModeling(
         tokenizer=tokenizer,
         mlm=False,
+        # Tensor-core friendly sequence lengths under fp16/bf16
+        pad_to_multiple_of=8 if cuda else None,
     )
     
     # Create trainer
@@ -119,32 +193,73 @@ def train_model(
     # Save training metadata
     save_training_metadata(out_path, base, data, schema, lora, epochs)
 
+# Above this many parameters, "auto" shards with FSDP instead of replicating with DDP
+_FSDP_MIN_PARAMS = 1_500_000_000
+
+def _parallel_args(model, parallel: str) -> Dict[str, Any]:
+    """TrainingArguments for DDP or FSDP; empty on a single GPU or CPU.
+    
+    Takes effect when launched with torchrun/accelerate. FSDP uses ZeRO-2-style
+    SHARD_GRAD_OP (grads and optimizer state sharded, params kept after forward).
+    """
+    if parallel not in ("ddp", "fsdp", "auto"):
+        raise ValueError(f"Unknown parallel strategy: {parallel}")
+    if torch.cuda.device_count() < 2:
+        return {}
+    
+    if parallel == "auto" and getattr(model, "is_loaded_in_4bit", False):
+        # 4-bit weights are not FSDP-sharded (and numel() counts packed storage)
+        parallel = "ddp"
+    
+    if parallel == "auto":
+        n_params = sum(p.numel() for p in model.parameters())
+        parallel = "fsdp" if n_params > _FSDP_MIN_PARAMS else "ddp"
+    
+    if parallel == "ddp":
+        # LoRA leaves the frozen trunk without grads; skip the unused-param scan
+        return {"ddp_find_unused_parameters": False}
+    
+    fsdp_config = {
+        "backward_prefetch": "backward_pre",
+        "limit_all_gathers": True,
+        "sync_module_states": True,
+        "use_orig_params": True,
+        "cpu_ram_efficient_loading": True,
+    }
+    # HF models name their decoder block class(es), so wrapping isn't Llama-specific
+    layer_classes = getattr(model, "_no_split_modules", None)
+    if layer_classes:
+        fsdp_config["transformer_layer_cls_to_wrap"] = list(layer_classes)
+    return {"fsdp": "shard_grad_op auto_wrap", "fsdp_config": fsdp_config}
+
 def load_schema(schema_path: str) -> Dict[str, Any]:
     """Load JSON schema for validation."""
-    with open(schema_path) as f:
-        return json.load(f)
+    return orjson.loads(Path(schema_path).read_bytes())
 
 def preprocess_dataset(dataset, tokenizer, schema_data: Dict[str, Any]) -> Any:
     """Preprocess dataset with schema-aware formatting."""
+    # Workers get the canonical schema bytes, not the dict: cheap to pickle per
+    # process, and each example skips re-serializing the schema for the cache key
+    schema_key = _schema_key(schema_data)
     
-    def format_example(example):
-        """Format a single example for training."""
+    def format_batch(examples):
+        """Format and tokenize a batch of examples (columns of lists)."""
         # Extract input and output
-        if "input" in example and "output" in example:
+        if "input" in examples and "output" in examples:
             # Structured input/output format
-            input_text = format_input(example["input"])
-            output_text = format_output(example["output"], schema_data)
+            full_texts = [
+                f"{format_input(input_data)}\n{_format_output(output_data, schema_key)}"
+                for input_data, output_data in zip(examples["input"], examples["output"])
+            ]
         else:
             # Assume it's already formatted
-            input_text = example.get("text", "")
-            output_text = ""
-        
-        # Combine input and output
-        full_text = f"{input_text}\n{output_text}"
+            batch_size = len(next(iter(examples.values()), []))
+            texts = examples["text"] if "text" in examples else [""] * batch_size
+            full_texts = [f"{text}\n" for text in texts]
         
-        # Tokenize
+        # Tokenize the whole batch in one call; the fast tokenizer splits it across threads
         tokenized = tokenizer(
-            full_text,
+            full_texts,
             truncation=True,
             max_length=2048,
             padding=False,
@@ -152,11 +267,20 @@ def preprocess_dataset(dataset, tokenizer, schema_data: Dict[str, Any]) -> Any:
         )
         
         # Add labels (same as input_ids for causal LM)
-        tokenized["labels"] = tokenized["input_ids"].copy()
+        tokenized["labels"] = [ids[:] for ids in tokenized["input_ids"]]
+        # Lengths for group_by_length, so the sampler needn't re-scan input_ids
+        tokenized["length"] = [len(ids) for ids in tokenized["input_ids"]]
         
         return tokenized
     
-    return dataset.map(format_example, remove_columns=dataset.column_names)
+    return dataset.map(
+        format_batch,
+        batched=True,
+        batch_size=1000,
+        num_proc=os.cpu_count(),
+        load_from_cache_file=True,
+        remove_columns=dataset.column_names,
+    )
 
 def format_input(input_data: Dict[str, Any]) -> str:
     """Format input data as text prompt."""
@@ -167,6 +291,7 @@ def format_input(input_data: Dict[str, Any]) -> str:
             if isinstance(value, str):
                 lines.append(f"{key}: {value}")
             else:
+                # stdlib json on purpose: the runtime builds the same prompt text
                 lines.append(f"{key}: {json.dumps(value)}")
         return "\n".join(lines)
     else:
@@ -174,65 +299,45 @@ def format_input(input_data: Dict[str, Any]) -> str:
 
 def format_output(output_data: Dict[str, Any], schema_data: Dict[str, Any]) -> str:
     """Format output data according to schema."""
+    return _format_output(output_data, _schema_key(schema_data))
+
+def _format_output(output_data: Dict[str, Any], schema_key: bytes) -> str:
+    """format_output against an already canonicalized schema."""
     # Validate output against schema
     try:
-        validate_against_schema(output_data, schema_data)
-        return json.dumps(output_data, indent=2)
+        _compiled_validator(schema_key)(output_data)
     except Exception as e:
         # If validation fails, still format but mark as invalid
         print(f"Warning: Output validation failed: {e}")
-        return json.dumps(output_data, indent=2)
+    # json.dumps, not orjson: this text is the training target, and orjson would
+    # write non-ASCII raw (json escapes it) and spell some floats differently
+    return json.dumps(output_data, indent=2)
 
-def validate_against_schema(data: Dict[str, Any], schema: Dict[str, Any]) -> bool:
-    """Validate data against JSON schema."""
-    # Simple validation - in practice, use jsonschema library
-    try:
-        # Check if data matches any entity in schema
-        definitions = schema.get("definitions", {})
-        for entity_name, entity_schema in definitions.items():
-            if validate_entity(data, entity_schema):
-                return True
-        return False
-    except Exception:
-        return False
+def _schema_key(schema: Dict[str, Any]) -> bytes:
+    """Canonical (key-sorted) bytes of a schema; equal schemas give equal keys."""
+    return orjson.dumps(schema, option=orjson.OPT_SORT_KEYS)
 
-def validate_entity(data: Dict[str, Any], entity_schema: Dict[str, Any]) -> bool:
-    """Validate data against a specific entity schema."""
-    properties = entity_schema.get("properties", {})
-    required = entity_schema.get("required", [])
-    
-    # Check required fields
-    for field in required:
-        if field not in data:
-            return False
+@lru_cache(maxsize=None)
+def _compiled_validator(schema_key: bytes) -> Callable[[Any], bool]:
+    """Compile a canonical (key-sorted) schema once into an is_valid(data) check."""
+    schema = orjson.loads(schema_key)
+    if fastjsonschema is None:
+        return jsonschema.Draft7Validator(schema).is_valid
     
-    # Check field types (simplified)
-    for field, value in data.items():
-        if field in properties:
-            field_schema = properties[field]
-            if not validate_field_value(value, field_schema):
-                return False
+    validate = fastjsonschema.compile(schema, use_default=False)
     
-    return True
+    def is_valid(data: Any) -> bool:
+        try:
+            validate(data)
+        except fastjsonschema.JsonSchemaException:
+            return False
+        return True
+    return is_valid
 
-def validate_field_value(value: Any, field_schema: Dict[str, Any]) -> bool:
-    """Validate a field value against its schema."""
-    field_type = field_schema.get("type")
-    
-    if field_type == "string":
-        return isinstance(value, str)
-    elif field_type == "integer":
-        return isinstance(value, int)
-    elif field_type == "number":
-        return isinstance(value, (int, float))
-    elif field_type == "boolean":
-        return isinstance(value, bool)
-    elif field_type == "array":
-        return isinstance(value, list)
-    elif field_type == "object":
-        return isinstance(value, dict)
-    
-    return True
+def validate_against_schema(data: Dict[str, Any], schema: Dict[str, Any]) -> bool:
+    """Validate data against JSON schema."""
+    # Equal schemas share one compiled validator across examples
+    return _compiled_validator(_schema_key(schema))(data)
 
 def save_training_metadata(out_path: Path, base: str, data: str, schema: str, lora: bool, epochs: int) -> None:
     """Save training metadata."""
@@ -245,5 +350,4 @@ def save_training_metadata(out_path: Path, base: str, data: str, schema: str, lo
         "training_completed": True,
     }
     
-    with open(out_path / "training_metadata.json", "w") as f:
-        json.dump(metadata, f, indent=2) 
\ No newline at end of file
+    (out_path / "training_metadata.json").write_bytes(orjson.dumps(metadata, option=orjson.OPT_INDENT_2)) 
\ No newline at end of file
@@ -1,45 +1,116 @@
 """IO utilities for the semantic toolchain."""
 
+import fnmatch
 import json
+import os
+import re
+import orjson
+import shutil
 import yaml
 from pathlib import Path
-from typing import Any, Dict, List, Union, Optional
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Union, Optional
 from contextlib import contextmanager
 
+# libyaml's C parser/emitter when PyYAML was built with it; pure-Python otherwise
+try:
+    from yaml import CSafeLoader as _YamlLoader, CDumper as _YamlDumper
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader, Dumper as _YamlDumper
+
+# Read size for the chunked line scanners (load_jsonl, count_lines)
+_READ_CHUNK = 4 << 20
+
 def load_yaml(file_path: Union[str, Path]) -> Any:
     """Load YAML file."""
     with open(file_path, 'r') as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=_YamlLoader)
 
 def save_yaml(data: Any, file_path: Union[str, Path]) -> None:
     """Save data to YAML file."""
     with open(file_path, 'w') as f:
-        yaml.dump(data, f, default_flow_style=False, indent=2)
+        # Dumper (not SafeDumper) as before, so tuples etc. still serialize
+        yaml.dump(data, f, Dumper=_YamlDumper, default_flow_style=False, indent=2)
 
 def load_json(file_path: Union[str, Path]) -> Any:
     """Load JSON file."""
-    with open(file_path, 'r') as f:
-        return json.load(f)
+    return orjson.loads(Path(file_path).read_bytes())
 
 def save_json(data: Any, file_path: Union[str, Path], indent: int = 2) -> None:
     """Save data to JSON file."""
+    if indent == 2:
+        Path(file_path).write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        return
+    # orjson only indents by two spaces; other layouts keep the stdlib encoder
     with open(file_path, 'w') as f:
         json.dump(data, f, indent=indent)
 
 def load_jsonl(file_path: Union[str, Path]) -> List[Dict[str, Any]]:
     """Load JSONL file."""
     data = []
-    with open(file_path, 'r') as f:
-        for line in f:
-            if line.strip():
-                data.append(json.loads(line))
+    append = data.append
+    tail = b""
+    with open(file_path, 'rb') as f:
+        # Big chunks split on b"\n" in C; the last piece may straddle into the next chunk
+        for chunk in iter(lambda: f.read(_READ_CHUNK), b""):
+            lines = (tail + chunk).split(b"\n")
+            tail = lines.pop()
+            for line in lines:
+                # Blank lines are skipped; orjson itself accepts surrounding whitespace
+                if line and not line.isspace():
+                    append(orjson.loads(line))
+    if tail and not tail.isspace():
+        append(orjson.loads(tail))
     return data
 
 def save_jsonl(data: List[Dict[str, Any]], file_path: Union[str, Path]) -> None:
     """Save data to JSONL file."""
-    with open(file_path, 'w') as f:
-        for item in data:
-            f.write(json.dumps(item) + '\n')
+    option = orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS
+    with open(file_path, 'wb') as f:
+        # writelines drives the generator in C instead of one f.write call per row
+        f.writelines(orjson.dumps(item, option=option) for item in data)
+
+def write_bytes(path: Union[str, Path], data: bytes) -> None:
+    """Write bytes to a file with raw os.write calls (no buffered/text layer)."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        # os.write may write less than asked; loop until everything is out
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+# Most buffers os.writev accepts per call (1024 on Linux)
+try:
+    _IOV_MAX = os.sysconf("SC_IOV_MAX")
+except (AttributeError, ValueError, OSError):
+    _IOV_MAX = 1024
+if _IOV_MAX <= 0:
+    _IOV_MAX = 1024
+
+def write_segments(path: Union[str, Path], segments: Sequence[bytes]) -> None:
+    """Write byte segments to a file with os.writev, without joining them first."""
+    if not hasattr(os, "writev"):
+        # Non-POSIX: the buffered writer still avoids building one big bytes object
+        with open(path, "wb") as f:
+            f.writelines(segments)
+        return
+    
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        pending = [memoryview(seg) for seg in segments if seg]
+        while pending:
+            written = os.writev(fd, pending[:_IOV_MAX])
+            # Drop fully written segments and trim a partially written one
+            done = 0
+            while done < len(pending) and written >= len(pending[done]):
+                written -= len(pending[done])
+                done += 1
+            pending = pending[done:]
+            if written:
+                pending[0] = pending[0][written:]
+    finally:
+        os.close(fd)
 
 def load_file(file_path: Union[str, Path]) -> str:
     """Load text file."""
@@ -83,10 +154,8 @@ def copy_file_safe(src: Union[str, Path], dst: Union[str, Path]) -> None:
         raise FileNotFoundError(f"Source file not found: {src}")
     
     dst.parent.mkdir(parents=True, exist_ok=True)
-    
-    with open(src, 'rb') as f_src:
-        with open(dst, 'wb') as f_dst:
-            f_dst.write(f_src.read())
+    # Kernel-side copy (sendfile/copy_file_range) without buffering the file in memory
+    shutil.copyfile(src, dst)
 
 def find_files(directory: Union[str, Path], pattern: str = "*") -> List[Path]:
     """Find files matching a pattern in a directory."""
@@ -102,23 +171,49 @@ def find_files_recursive(directory: Union[str, Path], pattern: str = "*") -> Lis
     if not directory.exists():
         return []
     
-    return list(directory.rglob(pattern))
+    # Path patterns ("sub/*.py", "**") need pathlib's segment-wise matching
+    if "/" in pattern or os.sep in pattern or "**" in pattern:
+        return list(directory.rglob(pattern))
+    
+    # Same case rules as pathlib: sensitive on POSIX, insensitive on Windows
+    flags = re.IGNORECASE if os.path.normcase("A") == "a" else 0
+    match = re.compile(fnmatch.translate(pattern), flags).match
+    return [Path(p) for p in _scan_matching(str(directory), match)]
+
+def _scan_matching(root: str, match: Callable[[str], Any]) -> Iterator[str]:
+    """Yield paths under root whose names match, walking like rglob (no symlinked dirs)."""
+    stack = [root]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            # rglob skips directories it cannot list
+            continue
+        with entries:
+            for entry in entries:
+                if match(entry.name):
+                    yield entry.path
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
 
 def get_file_size(file_path: Union[str, Path]) -> int:
     """Get file size in bytes."""
     return Path(file_path).stat().st_size
 
-def get_file_hash(file_path: Union[str, Path], algorithm: str = "md5") -> str:
-    """Get file hash."""
+def get_file_hash(file_path: Union[str, Path], algorithm: str = "sha256") -> str:
+    """Get file hash (sha256 by default; pass "md5" for the old digest)."""
     import hashlib
     
     file_path = Path(file_path)
     if not file_path.exists():
         raise FileNotFoundError(f"File not found: {file_path}")
     
-    hash_obj = hashlib.new(algorithm)
     with open(file_path, 'rb') as f:
-        for chunk in iter(lambda: f.read(4096), b""):
+        if hasattr(hashlib, "file_digest"):
+            # 3.11+: hashes from the file in C (OpenSSL, SHA-NI where available)
+            return hashlib.file_digest(f, algorithm).hexdigest()
+        hash_obj = hashlib.new(algorithm)
+        for chunk in iter(lambda: f.read(1 << 20), b""):
             hash_obj.update(chunk)
     
     return hash_obj.hexdigest()
@@ -161,8 +256,15 @@ def append_line(line: str, file_path: Union[str, Path]) -> None:
 
 def count_lines(file_path: Union[str, Path]) -> int:
     """Count lines in a file."""
-    with open(file_path, 'r') as f:
-        return sum(1 for _ in f)
+    count = 0
+    last = b"\n"
+    with open(file_path, 'rb') as f:
+        # bytes.count is one memchr-style scan per chunk instead of a Python loop per line
+        for chunk in iter(lambda: f.read(_READ_CHUNK), b""):
+            count += chunk.count(b"\n")
+            last = chunk[-1:]
+    # A final line without a trailing newline still counts
+    return count + (last != b"\n")
 
 def is_binary_file(file_path: Union[str, Path]) -> bool:
     """Check if a file is binary."""
@@ -1,7 +1,11 @@
 """Logging utilities for the semantic toolchain."""
 
+import atexit
 import logging
+import os
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from typing import Optional, Dict, Any
 from rich.logging import RichHandler
@@ -17,6 +21,9 @@ CUSTOM_THEME = Theme({
     "debug": "dim",
 })
 
+# Background thread that writes the "stc" logger's file records
+_listener: Optional[QueueListener] = None
+
 def setup_logging(
     level: str = "INFO",
     log_file: Optional[str] = None,
@@ -38,6 +45,11 @@ def setup_logging(
     
     formatter = logging.Formatter(format_string)
     
+    level_no = getattr(logging, level.upper())
+    
+    # Rich rendering only pays off on an interactive terminal; honour NO_COLOR too
+    use_rich = use_rich and sys.stdout.isatty() and "NO_COLOR" not in os.environ
+    
     # Console handler
     if use_rich:
         console = Console(theme=CUSTOM_THEME)
@@ -48,13 +60,12 @@ def setup_logging(
             markup=True,
             rich_tracebacks=True
         )
-        console_handler.setLevel(getattr(logging, level.upper()))
-        logger.addHandler(console_handler)
     else:
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setFormatter(formatter)
-        console_handler.setLevel(getattr(logging, level.upper()))
-        logger.addHandler(console_handler)
+    console_handler.setLevel(level_no)
+    # Synchronous: QueueHandler.prepare strips exc_info, which rich_tracebacks needs
+    logger.addHandler(console_handler)
     
     # File handler
     if log_file:
@@ -63,8 +74,22 @@ def setup_logging(
         
         file_handler = logging.FileHandler(log_file)
         file_handler.setFormatter(formatter)
-        file_handler.setLevel(getattr(logging, level.upper()))
-        logger.addHandler(file_handler)
+        file_handler.setLevel(level_no)
+    
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        atexit.unregister(_listener.stop)
+        _listener = None
+    
+    # File writes happen on the listener thread; callers only enqueue
+    if log_file:
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        _listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+        _listener.start()
+        # Drain queued records before the interpreter exits
+        atexit.register(_listener.stop)
+        logger.addHandler(QueueHandler(log_queue))
     
     return logger
 
@@ -164,13 +189,17 @@ def log_function_call(func):
     """Decorator to log function calls."""
     def wrapper(*args, **kwargs):
         logger = get_logger(func.__module__)
-        logger.debug(f"Calling {func.__name__} with args={args}, kwargs={kwargs}")
+        # repr of args can be huge (tensors, datasets); only build it when DEBUG is on
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("Calling %s with args=%s, kwargs=%s", func.__name__, args, kwargs)
         try:
             result = func(*args, **kwargs)
-            logger.debug(f"{func.__name__} returned {result}")
+            if debug:
+                logger.debug("%s returned %s", func.__name__, result)
             return result
         except Exception as e:
-            logger.error(f"{func.__name__} raised {type(e).__name__}: {e}")
+            logger.error("%s raised %s: %s", func.__name__, type(e).__name__, e)
             raise
     return wrapper
 
@@ -180,15 +209,16 @@ def log_execution_time(func):
     
     def wrapper(*args, **kwargs):
         logger = get_logger(func.__module__)
-        start_time = time.time()
+        # Monotonic, high-resolution clock; wall-clock time can jump
+        start_time = time.perf_counter_ns()
         try:
             result = func(*args, **kwargs)
-            execution_time = time.time() - start_time
-            logger.info(f"{func.__name__} executed in {execution_time:.2f}s")
+            execution_time = (time.perf_counter_ns() - start_time) / 1e9
+            logger.info("%s executed in %.2fs", func.__name__, execution_time)
             return result
         except Exception as e:
-            execution_time = time.time() - start_time
-            logger.error(f"{func.__name__} failed after {execution_time:.2f}s: {e}")
+            execution_time = (time.perf_counter_ns() - start_time) / 1e9
+            logger.error("%s failed after %.2fs: %s", func.__name__, execution_time, e)
             raise
     return wrapper
 
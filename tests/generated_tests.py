@@ -14,10 +14,13 @@ with open(SCHEMA_PATH) as f:
 
 validator = jsonschema.Draft7Validator(SCHEMA)
 
+# Build each entity's strategy once instead of per test and per draw
+_STRATEGIES = {name: from_schema(defn) for name, defn in SCHEMA['definitions'].items()}
+
 # Tests for Person entity
 class TestPerson:
 
-    @given(from_schema(SCHEMA['definitions']['Person']))
+    @given(_STRATEGIES['Person'])
     def test_person_valid_schema(self, data):
         """Test that generated Person data is valid."""
         errors = list(validator.iter_errors(data))
@@ -27,7 +30,7 @@ class TestPerson:
     def test_person_required_fields(self, data):
         """Test that Person has all required fields."""
         # Generate valid data
-        valid_data = data.draw(from_schema(SCHEMA['definitions']['Person']))
+        valid_data = data.draw(_STRATEGIES['Person'])
         
         # Check each required field
         for field in ['name', 'age', 'status']:
@@ -38,7 +41,7 @@ class TestPerson:
 # Tests for Product entity
 class TestProduct:
 
-    @given(from_schema(SCHEMA['definitions']['Product']))
+    @given(_STRATEGIES['Product'])
     def test_product_valid_schema(self, data):
         """Test that generated Product data is valid."""
         errors = list(validator.iter_errors(data))
@@ -48,7 +51,7 @@ class TestProduct:
     def test_product_required_fields(self, data):
         """Test that Product has all required fields."""
         # Generate valid data
-        valid_data = data.draw(from_schema(SCHEMA['definitions']['Product']))
+        valid_data = data.draw(_STRATEGIES['Product'])
         
         # Check each required field
         for field in ['id', 'name', 'price', 'category']:
@@ -0,0 +1,30 @@
+"""Tests for validating data against an ontology."""
+
+from stc.ontology.models import EntitySpec, FieldSpec, Ontology
+from stc.ontology.validators import validate_data_against_ontology
+
+ONTOLOGY = Ontology(
+    name="shop",
+    entities={
+        "Person": EntitySpec(fields={"name": FieldSpec(type="string")}),
+        "Product": EntitySpec(fields={
+            "title": FieldSpec(type="string"),
+            "type": FieldSpec(type="string", enum=("book", "music")),
+        }),
+    },
+)
+
+def test_type_naming_an_entity_dispatches_to_it():
+    assert validate_data_against_ontology({"type": "Person", "name": "Ada"}, ONTOLOGY) == []
+    assert validate_data_against_ontology({"type": "Person", "title": "x"}, ONTOLOGY) == [
+        "Missing required field: name",
+        "Unknown field: title",
+    ]
+
+def test_type_field_holding_entity_data_is_swept():
+    assert validate_data_against_ontology({"title": "Dune", "type": "book"}, ONTOLOGY) == []
+
+def test_unmatched_type_value_reports_sweep_errors():
+    errors = validate_data_against_ontology({"title": "Dune", "type": "film"}, ONTOLOGY)
+    assert "Field 'type': Value 'film' not in enum ['book', 'music']" in errors
+    assert errors[-1] == "Data doesn't match any defined entity"
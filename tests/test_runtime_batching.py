@@ -0,0 +1,65 @@
+"""Tests for batched generation in the model runtime."""
+
+import contextlib
+import sys
+import types
+
+import pytest
+
+from stc.deploy.runtime import ModelRuntime
+
+PAD_ID = 0
+NEW_TOKEN_ID = 7
+
+class _Batch:
+    def __init__(self, input_ids):
+        self.input_ids = input_ids
+        self.attention_mask = [[int(t != PAD_ID) for t in row] for row in input_ids]
+
+    def to(self, device):
+        return self
+
+class _Tokenizer:
+    pad_token_id = PAD_ID
+    eos_token_id = 1
+
+    def __call__(self, text, truncation=True, max_length=2048):
+        return {"input_ids": [2] * len(text.split())}
+
+    def pad(self, features, padding=True, return_tensors=None):
+        rows = features["input_ids"]
+        width = max(len(row) for row in rows)
+        return _Batch([[PAD_ID] * (width - len(row)) + row for row in rows])
+
+    def batch_decode(self, outputs, skip_special_tokens=True):
+        return ['{"new_tokens": %d}' % row.count(NEW_TOKEN_ID) for row in outputs]
+
+class _Model:
+    device = "cpu"
+
+    def generate(self, input_ids, max_length=None, max_new_tokens=None, **kwargs):
+        # Mirrors transformers: max_length counts the (padded) prompt, max_new_tokens doesn't
+        width = len(input_ids[0])
+        budget = max_new_tokens if max_new_tokens is not None else max(max_length - width, 0)
+        return [row + [NEW_TOKEN_ID] * budget for row in input_ids]
+
+class _FakeRuntime(ModelRuntime):
+    def _load_model(self):
+        self.tokenizer = _Tokenizer()
+        self.model = _Model()
+        self._encode = self._encode_prompt
+
+@pytest.fixture
+def runtime(monkeypatch):
+    monkeypatch.setitem(sys.modules, "torch", types.SimpleNamespace(inference_mode=contextlib.nullcontext))
+    rt = _FakeRuntime("unused", validator=None)
+    yield rt
+    rt.close()
+
+def test_output_budget_does_not_depend_on_batch_mates(runtime):
+    short, long = "word " * 3, "word " * 600
+    alone = runtime._generate_batch([short])[0]
+    batched = runtime._generate_batch([short, long])
+    assert batched[0] == alone
+    assert batched[1] == alone
+    assert alone["new_tokens"] > 0